@@ -22,6 +22,9 @@ def create_app(test_config: dict = None):
     )
     app.config.setdefault("SQLALCHEMY_TRACK_MODIFICATIONS", False)
 
+    # --- Password hashing: bcrypt work factor for new hashes (rehashed on login) ---
+    app.config.setdefault("BCRYPT_LOG_ROUNDS", int(os.environ.get("BCRYPT_LOG_ROUNDS", 12)))
+
     # --- Apply CORS ---
     CORS(
         app,
@@ -34,9 +37,45 @@ def create_app(test_config: dict = None):
     if test_config:
         app.config.update(test_config)
 
+    # --- JSON provider (orjson when installed, stdlib otherwise) ---
+    from services.json_provider import init_json
+    init_json(app)
+
+    # --- Bounded bcrypt executor (must exist before init_db seeds the admin) ---
+    from services.passwords import password_hasher
+    password_hasher.init_app(app)
+
     # --- Initialize database ---
     init_db(app)
 
+    # --- Optional Prometheus /metrics (request latency, pool, bcrypt, clock events) ---
+    from services.metrics import metrics
+    metrics.init_app(app)
+
+    # --- Per-request SQL statistics, slow-query log and N+1 detection ---
+    from services.query_stats import query_instrumentation
+    query_instrumentation.init_app(app)
+
+    # --- Authenticated principal cache (used by jwt_required) ---
+    from services.principal_cache import principal_cache
+    principal_cache.init_app(app)
+
+    # --- WebAuthn credential descriptor cache ---
+    from services.credential_cache import descriptor_cache
+    descriptor_cache.init_app(app)
+
+    # --- Versioned report/dashboard response cache (ETag/304) ---
+    from services.response_cache import response_cache
+    response_cache.init_app(app)
+
+    # --- WebAuthn ceremony challenge store ---
+    from services.challenge_store import init_challenge_store
+    init_challenge_store(app)
+
+    # --- Optional group-commit path for clock events ---
+    from services.group_commit import group_committer
+    group_committer.init_app(app)
+
     # --- Import and register blueprints ---
     from routes.auth import auth_bp
     from routes.attendance import attendance_bp
@@ -52,6 +91,10 @@ def create_app(test_config: dict = None):
     app.register_blueprint(webauthn_bp, url_prefix="/api/webauthn")
     app.register_blueprint(employees_bp, url_prefix="/api")
 
+    # --- CLI maintenance commands ---
+    from commands import register_commands
+    register_commands(app)
+
     # --- Health check route ---
     @app.route("/api/health", methods=["GET"])
     def health():
@@ -0,0 +1,115 @@
+# benchmarks/bench_cold_start.py
+"""
+Worker cold start: importing app.py with and without DB_AUTO_INIT, and
+gunicorn workers with and without preload_app.
+
+    python benchmarks/bench_cold_start.py --runs 7
+    python benchmarks/bench_cold_start.py --gunicorn 4
+
+Import mode starts a fresh interpreter per run (what a non-preloaded
+gunicorn worker does) against an initialised SQLite file and reports the
+median time to import app.py and the SQL statements it ran. Gunicorn mode
+boots -w N workers per preload setting and reports the "ready in" times
+gunicorn.conf.py logs for each worker.
+"""
+import argparse
+import json
+import os
+import re
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+
+from common import ROOT, make_app, seed_users
+
+_IMPORT_PROBE = """
+import json, time, warnings
+warnings.simplefilter("ignore")
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+statements = []
+event.listen(Engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+started = time.perf_counter()
+import app
+print(json.dumps({"ms": (time.perf_counter() - started) * 1000, "queries": len(statements)}))
+"""
+
+
+def import_times(db_path: str, auto_init: bool, runs: int) -> dict:
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{db_path}", "DB_AUTO_INIT": "1" if auto_init else "0"}
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", _IMPORT_PROBE], cwd=ROOT, env=env,
+                             capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(out.strip().splitlines()[-1]))
+    return {
+        "medianMs": round(statistics.median(s["ms"] for s in samples), 1),
+        "minMs": round(min(s["ms"] for s in samples), 1),
+        "queries": samples[-1]["queries"],
+    }
+
+
+def gunicorn_ready_times(db_path: str, workers: int, preload: bool, timeout: float = 60) -> list:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "DB_AUTO_INIT": "0",
+        "GUNICORN_PRELOAD": "1" if preload else "0",
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app:app", "-w", str(workers), "--bind", f"127.0.0.1:{port}"],
+        cwd=ROOT, env=env, stderr=subprocess.PIPE, text=True,
+    )
+    ready = []
+    deadline = time.monotonic() + timeout
+    try:
+        for line in proc.stderr:
+            match = re.search(r"Worker \d+ ready in ([\d.]+) ms", line)
+            if match:
+                ready.append(float(match.group(1)))
+            if len(ready) == workers or time.monotonic() > deadline:
+                break
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=30)
+    return ready
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="interpreter starts per import mode")
+    parser.add_argument("--users", type=int, default=1000, help="users in the test database")
+    parser.add_argument("--gunicorn", type=int, metavar="WORKERS", help="also boot gunicorn with this many workers")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    # Initialise the schema once, as `flask --app app init-db` would
+    app, db_path = make_app()
+    seed_users(app, args.users)
+
+    try:
+        for auto_init in (True, False):
+            result = import_times(db_path, auto_init, args.runs)
+            print(f"import app.py, DB_AUTO_INIT={int(auto_init)}: median {result['medianMs']} ms "
+                  f"(min {result['minMs']} ms), {result['queries']} SQL statements")
+        if args.gunicorn:
+            for preload in (False, True):
+                ready = gunicorn_ready_times(db_path, args.gunicorn, preload)
+                if not ready:
+                    print(f"gunicorn preload={preload}: no worker reported ready")
+                    continue
+                print(f"gunicorn -w {args.gunicorn} preload={preload}: worker ready in "
+                      f"median {statistics.median(ready):.1f} ms, max {max(ready):.1f} ms")
+    finally:
+        os.remove(db_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_group_commit.py
+"""
+Clock-in throughput with and without group commit.
+
+    python benchmarks/bench_group_commit.py --users 2000 --threads 32
+
+Each mode gets a fresh SQLite file; every user clocks in once from a pool
+of request threads using the Flask test client.
+"""
+import argparse
+import os
+import threading
+import warnings
+
+from common import make_app, seed_users, Timer
+
+
+def run(mode: str, users: int, threads: int, interval_ms: int, max_events: int) -> dict:
+    config = {
+        "GROUP_COMMIT_ENABLED": mode == "group",
+        "GROUP_COMMIT_INTERVAL_MS": interval_ms,
+        "GROUP_COMMIT_MAX_EVENTS": max_events,
+    }
+    app, db_path = make_app(**config)
+    user_ids = seed_users(app, users)
+    chunks = [user_ids[i::threads] for i in range(threads)]
+    failures = []
+
+    def worker(ids):
+        client = app.test_client()
+        for user_id in ids:
+            resp = client.post("/api/attendance/clock-in", json={"user_id": str(user_id)})
+            if resp.status_code != 201:
+                failures.append(resp.status_code)
+
+    pool = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+    with Timer() as t:
+        for th in pool:
+            th.start()
+        for th in pool:
+            th.join()
+    os.remove(db_path)
+    return {
+        "mode": mode,
+        "punches": users,
+        "seconds": round(t.elapsed, 3),
+        "punchesPerSecond": round(users / t.elapsed, 1),
+        "failures": len(failures),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--interval-ms", type=int, default=5)
+    parser.add_argument("--max-events", type=int, default=200)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    for mode in ("single", "group"):
+        result = run(mode, args.users, args.threads, args.interval_ms, args.max_events)
+        print(f"{result['mode']:>6}: {result['punchesPerSecond']:>8} punches/s "
+              f"({result['punches']} in {result['seconds']}s, {result['failures']} failed)")
+
+
+if __name__ == "__main__":
+    main()
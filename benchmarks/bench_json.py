@@ -0,0 +1,82 @@
+# benchmarks/bench_json.py
+"""
+JSON encoding of a 10k-row attendance-logs payload.
+
+    python benchmarks/bench_json.py --rows 10000 --repeat 20
+
+Compares building per-row dicts by hand (isoformat/str/float) against the
+RowSerializer path, each encoded by the stdlib and orjson backends of
+FastJSONProvider. No database is involved: rows are plain tuples shaped
+like the attendance_logs query result.
+"""
+import argparse
+import random
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from common import Timer, percentile  # noqa: F401  (adds the repo root to sys.path)
+from flask import Flask
+
+from services.json_provider import FastJSONProvider, orjson
+from routes.admin import ATTENDANCE_LOG_ROW
+
+
+def make_rows(count: int) -> list:
+    users = [(uuid.uuid4(), f"Employee {i:04d}") for i in range(500)]
+    rows = []
+    for i in range(count):
+        user_id, name = users[i % len(users)]
+        day = date(2026, 1, 1) + timedelta(days=i // len(users))
+        clock_in = datetime.combine(day, datetime.min.time()) + timedelta(hours=8, seconds=random.randint(0, 7200))
+        rows.append((
+            uuid.uuid4(), user_id, name, day, clock_in,
+            clock_in + timedelta(hours=8), Decimal(f"{random.uniform(7, 9):.2f}"),
+        ))
+    return rows
+
+
+def by_hand(rows) -> list:
+    return [{
+        "id": str(rec[0]),
+        "userId": str(rec[1]),
+        "userName": rec[2],
+        "date": rec[3].isoformat() if rec[3] else None,
+        "clockIn": rec[4].isoformat() if rec[4] else None,
+        "clockOut": rec[5].isoformat() if rec[5] else None,
+        "totalHours": float(rec[6]) if rec[6] is not None else None,
+    } for rec in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    app = Flask(__name__)
+    cases = [("dicts by hand", by_hand), ("RowSerializer", ATTENDANCE_LOG_ROW.many)]
+    backends = ["stdlib"] + (["orjson"] if orjson is not None else [])
+    reference = None
+
+    with app.app_context():
+        for backend in backends:
+            app.json = FastJSONProvider(app, backend)
+            for label, build in cases:
+                samples = []
+                for _ in range(args.repeat):
+                    with Timer() as t:
+                        body = app.json.response({"meta": {}, "data": build(rows)}).get_data()
+                    samples.append(t.elapsed)
+                decoded = app.json.loads(body)
+                reference = reference or decoded
+                same = "same output" if decoded == reference else "OUTPUT DIFFERS"
+                print(f"{backend:>6} {label:<14}: median {percentile(samples, 50) * 1000:7.1f} ms  "
+                      f"p95 {percentile(samples, 95) * 1000:7.1f} ms  {len(body) / 1e6:.2f} MB  {same}")
+        if orjson is None:
+            print("orjson is not installed; only the stdlib backend was measured")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+# benchmarks/bench_load.py
+"""
+End-to-end load benchmark of the real endpoints on a seeded database.
+
+    python benchmarks/bench_load.py --users 2000 --days 60 --requests 500 --threads 8 --out results/base.json
+    python benchmarks/bench_load.py --db /tmp/load.db --reuse --compare results/base.json
+    python benchmarks/bench_load.py --url http://127.0.0.1:8000 --db /tmp/load.db --reuse
+
+Seeds --users employees with --days of history through services.seed
+(skipped with --reuse on an already seeded --db), then runs each scenario
+in turn: --requests requests spread over --threads threads. Reports
+p50/p95/p99 latency, throughput, errors and SQL statements per request
+(from the X-DB-Query-Count header, so a --url server must run with
+SQL_STATS_HEADERS=1; streamed responses such as export_monthly run their
+query after the header is sent and report ~0). Login goes through the
+bcrypt admission limit, so expect 429s when --threads exceeds
+BCRYPT_MAX_CONCURRENCY + BCRYPT_QUEUE_DEPTH. --out saves the results as JSON; --compare prints
+the change against an earlier result file.
+
+With --url the server must use the --db file and the same SECRET_KEY;
+JWTs are minted locally. Seeded passwords are hashed at --bcrypt-cost
+(default 4) so `login` measures the request path rather than bcrypt.
+clock_in/clock_out punch today for one user per request, so against a
+reused --db they succeed once per day.
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import threading
+import warnings
+from collections import Counter
+from datetime import date, datetime, timedelta
+from urllib.parse import urlsplit
+
+from common import ROOT, make_app, percentile, Timer
+
+
+class _TestClient:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, headers=None, body=None):
+        resp = self.client.open(path, method=method, headers=headers, data=body)
+        resp.get_data()  # drain streamed responses inside the timing
+        return resp.status_code, resp.headers.get("X-DB-Query-Count")
+
+
+class _HttpClient:
+    """One keep-alive connection per thread."""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.conn = cls(parts.netloc, timeout=60)
+
+    def request(self, method, path, headers=None, body=None):
+        self.conn.request(method, path, body=body, headers=headers or {})
+        resp = self.conn.getresponse()
+        resp.read()
+        return resp.status, resp.getheader("X-DB-Query-Count")
+
+
+def scenarios(ctx) -> dict:
+    """name -> function(i) returning (method, path, headers, body) for the i-th request."""
+    admin = {"Authorization": f"Bearer {ctx['admin_token']}"}
+    as_json = {"Content-Type": "application/json"}
+    users, emails, tokens = ctx["user_ids"], ctx["emails"], ctx["tokens"]
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    month_ago = (date.today() - timedelta(days=30)).isoformat()
+
+    def punch(kind):
+        return lambda i: ("POST", f"/api/attendance/{kind}", as_json,
+                          json.dumps({"user_id": str(users[i % len(users)])}))
+
+    return {
+        "login": lambda i: ("POST", "/api/auth/login", as_json,
+                            json.dumps({"email": emails[i % len(emails)], "password": ctx["password"]})),
+        # clock-in must run before clock-out: each request punches a different user
+        "clock_in": punch("clock-in"),
+        "clock_out": punch("clock-out"),
+        "history": lambda i: ("GET", f"/api/attendance/history?user_id={users[i % len(users)]}", {}, None),
+        "registration_status": lambda i: ("GET", "/api/webauthn/registration-status",
+                                          {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}, None),
+        "dashboard": lambda i: ("GET", "/api/admin/dashboard", admin, None),
+        "attendance_logs": lambda i: ("GET", f"/api/admin/attendance-logs?date={yesterday}&per_page=50", admin, None),
+        "attendance_logs_search": lambda i: ("GET", "/api/admin/attendance-logs?search=smith&per_page=50", admin, None),
+        "employees_page": lambda i: ("GET", "/api/admin/employees?cursor=&per_page=50", admin, None),
+        "users_list": lambda i: ("GET", "/api/auth/users", admin, None),
+        "absenteeism_30d": lambda i: ("GET", f"/api/reports/absenteeism-trends?from={month_ago}&groupBy=department",
+                                      admin, None),
+        "working_hours_30d": lambda i: ("GET", f"/api/reports/working-hours?from={month_ago}", admin, None),
+        "export_monthly": lambda i: ("GET", "/api/reports/download?type=monthly", admin, None),
+    }
+
+
+# Scenarios that move a whole report run a fraction of --requests
+HEAVY = {"export_monthly": 20, "users_list": 5}
+
+
+def run_scenario(make_client, build, requests: int, threads: int) -> dict:
+    latencies, queries, errors, statuses = [], [], [], Counter()
+    counter = iter(range(requests))
+    lock = threading.Lock()
+
+    def worker():
+        client = make_client()
+        local_latency, local_queries, local_errors, local_statuses = [], [], 0, Counter()
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            method, path, headers, body = build(i)
+            try:
+                with Timer() as t:
+                    status, query_count = client.request(method, path, headers, body)
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                continue
+            local_latency.append(t.elapsed)
+            local_statuses[status] += 1
+            if status >= 400:
+                local_errors += 1
+            if query_count is not None:
+                local_queries.append(int(query_count))
+        with lock:
+            latencies.extend(local_latency)
+            queries.extend(local_queries)
+            errors.append(local_errors)
+            statuses.update(local_statuses)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    with Timer() as t:
+        for th in pool:
+            th.start()
+        for th in pool:
+            th.join()
+
+    def ms(pct):
+        value = percentile(latencies, pct)
+        return None if value is None else round(value * 1000, 2)
+
+    return {
+        "requests": requests,
+        "errors": sum(errors),
+        "statusCodes": {str(code): n for code, n in sorted(statuses.items())},
+        "seconds": round(t.elapsed, 3),
+        "requestsPerSecond": round(requests / t.elapsed, 1),
+        "latencyMs": {"p50": ms(50), "p95": ms(95), "p99": ms(99)},
+        "queriesPerRequest": round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+
+def _context(app, seed_args, reuse: bool) -> dict:
+    from sqlalchemy import select
+    from database import db
+    from models import User
+    from routes.auth import create_jwt_token
+    from services.seed import SEED_EMAIL_DOMAIN, SEED_PASSWORD, seed
+
+    with app.app_context():
+        if not reuse:
+            print("seeded:", seed(**seed_args))
+        rows = db.session.execute(
+            select(User.id, User.email)
+            .where(User.email.like(f"%@{SEED_EMAIL_DOMAIN}"), User.status == "Active")
+            .order_by(User.email)
+        ).all()
+        admin_id = db.session.execute(select(User.id).where(User.role == "admin")).scalars().first()
+        return {
+            "user_ids": [r.id for r in rows],
+            "emails": [r.email for r in rows],
+            "tokens": [create_jwt_token(str(r.id), "employee") for r in rows[:200]],
+            "admin_token": create_jwt_token(str(admin_id), "admin"),
+            "password": SEED_PASSWORD,
+        }
+
+
+def _meta(args) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "target": args.url or "test-client",
+        "args": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+    }
+
+
+def compare(current: dict, baseline: dict):
+    print(f"\nchange vs {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')}):")
+    for name, result in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if not before:
+            continue
+
+        def delta(new, old):
+            if new is None or not old:
+                return "    n/a"
+            return f"{(new - old) / old * 100:+6.1f}%"
+
+        print(f"  {name:>24}: p50 {delta(result['latencyMs']['p50'], before['latencyMs']['p50'])}"
+              f"  p95 {delta(result['latencyMs']['p95'], before['latencyMs']['p95'])}"
+              f"  req/s {delta(result['requestsPerSecond'], before['requestsPerSecond'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--requests", type=int, default=300, help="requests per scenario")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--scenarios", help="comma-separated subset to run (default: all)")
+    parser.add_argument("--db", help="SQLite file to seed/use (default: a temp file)")
+    parser.add_argument("--reuse", action="store_true", help="--db is already seeded; skip seeding")
+    parser.add_argument("--url", help="send requests to this server instead of the test client")
+    parser.add_argument("--bcrypt-cost", type=int, default=4, help="cost of the seeded password hash")
+    parser.add_argument("--random-seed", type=int, default=1)
+    parser.add_argument("--out", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="earlier --out file to compare against")
+    args = parser.parse_args()
+    if (args.url or args.reuse) and not args.db:
+        parser.error("--url and --reuse need --db")
+    warnings.simplefilter("ignore")
+
+    # The results table replaces the slow-query log; headers give queries per request
+    app, db_path = make_app(args.db, SQL_STATS_HEADERS=True, SLOW_QUERY_MS=0, BCRYPT_LOG_ROUNDS=args.bcrypt_cost)
+    ctx = _context(app, {
+        "users": args.users, "days": args.days, "rng_seed": args.random_seed, "bcrypt_cost": args.bcrypt_cost,
+    }, args.reuse)
+    if args.url:
+        def make_client():
+            return _HttpClient(args.url)
+    else:
+        def make_client():
+            return _TestClient(app)
+
+    available = scenarios(ctx)
+    names = args.scenarios.split(",") if args.scenarios else list(available)
+    unknown = [n for n in names if n not in available]
+    if unknown:
+        parser.error(f"unknown scenario(s) {', '.join(unknown)}; choose from {', '.join(available)}")
+
+    results = {"meta": _meta(args), "scenarios": {}}
+    print(f"{'scenario':>24}  {'req/s':>8}  {'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}  {'queries':>7}  errors")
+    for name in names:
+        requests = max(args.requests // HEAVY.get(name, 1), args.threads)
+        if name in ("clock_in", "clock_out"):
+            requests = min(requests, len(ctx["user_ids"]))  # one punch per user per day
+        result = run_scenario(make_client, available[name], requests, args.threads)
+        results["scenarios"][name] = result
+        latency = result["latencyMs"]
+        print(f"{name:>24}  {result['requestsPerSecond']:>8}  {latency['p50']:>8}  {latency['p95']:>8}  "
+              f"{latency['p99']:>8}  {result['queriesPerRequest']!s:>7}  {result['errors']}")
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"results written to {args.out}")
+    if args.compare:
+        with open(args.compare) as fh:
+            compare(results, json.load(fh))
+    if args.db is None:
+        os.remove(db_path)
+
+
+if __name__ == "__main__":
+    main()
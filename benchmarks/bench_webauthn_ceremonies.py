@@ -0,0 +1,178 @@
+# benchmarks/bench_webauthn_ceremonies.py
+"""
+Full WebAuthn register + login ceremonies driven by a software authenticator.
+
+    python benchmarks/bench_webauthn_ceremonies.py --users 1000 --logins 2 --threads 16
+    python benchmarks/bench_webauthn_ceremonies.py --url http://127.0.0.1:8000 --db /tmp/bench.db
+
+By default requests go through the Flask test client on a fresh SQLite
+file. With --url they are sent over HTTP to a running server instead; that
+server must use the --db file (DATABASE_URL=sqlite:////tmp/bench.db), the
+same SECRET_KEY, and the WEBAUTHN_ORIGIN / WEBAUTHN_RP_ID this script is
+given (defaults match the app's). Users are seeded into the database
+directly and JWTs minted locally, so no bcrypt work is measured.
+
+Reports ceremonies per second, p50/p95/p99 latency per phase and, in
+process only, SQL statements per ceremony.
+"""
+import argparse
+import http.client
+import json
+import os
+import threading
+import warnings
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from common import make_app, seed_users, percentile, QueryCounter, Timer
+from soft_authenticator import SoftAuthenticator
+
+PHASES = ("register_begin", "register_finish", "login_begin", "login_finish")
+
+
+class _TestClient:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, headers=None, body=None):
+        resp = self.client.open(path, method=method, headers=headers, data=body)
+        return resp.status_code, resp.get_json(silent=True)
+
+
+class _HttpClient:
+    """One keep-alive connection per thread."""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.conn = cls(parts.netloc, timeout=30)
+
+    def request(self, method, path, headers=None, body=None):
+        self.conn.request(method, path, body=body, headers=headers or {})
+        resp = self.conn.getresponse()
+        data = resp.read()
+        try:
+            return resp.status, json.loads(data)
+        except ValueError:
+            return resp.status, None
+
+
+def ceremony(client, authenticator, user_id, token, logins, timings) -> bool:
+    """One registration followed by `logins` logins; False on the first failed phase."""
+    auth = {"Authorization": f"Bearer {token}"}
+
+    def call(phase, method, path, headers=None, body=None, expect=200):
+        with Timer() as t:
+            status, payload = client.request(method, path, headers, body)
+        timings[phase].append(t.elapsed)
+        return payload if status == expect else None
+
+    options = call("register_begin", "GET", "/api/webauthn/register/begin", auth)
+    if options is None:
+        return False
+    done = call(
+        "register_finish", "POST", f"/api/webauthn/register/finish?ceremonyId={options['ceremonyId']}",
+        {**auth, "Content-Type": "application/json"}, authenticator.create(options),
+    )
+    if done is None:
+        return False
+
+    for _ in range(logins):
+        options = call("login_begin", "GET", f"/api/webauthn/login/begin?userId={user_id}")
+        if options is None:
+            return False
+        done = call(
+            "login_finish", "POST",
+            f"/api/webauthn/login/finish?userId={user_id}&ceremonyId={options['ceremonyId']}",
+            {"Content-Type": "application/json"}, authenticator.get(options),
+        )
+        if done is None:
+            return False
+    return True
+
+
+def run(args) -> dict:
+    from database import db
+    from routes.auth import create_jwt_token
+    from services.webauthn_service import WebAuthnService
+
+    app, db_path = make_app(args.db, WEBAUTHN_CHALLENGE_STORE=args.challenge_store)
+    user_ids = seed_users(app, args.users)
+    with app.app_context():
+        tokens = {user_id: create_jwt_token(str(user_id), "employee") for user_id in user_ids}
+        engine = db.engine
+        origin = args.origin or WebAuthnService._get_origin()
+
+    authenticator = SoftAuthenticator(origin)
+    timings = defaultdict(list)
+    failures = []
+    chunks = [user_ids[i::args.threads] for i in range(args.threads)]
+
+    def worker(ids):
+        client = _HttpClient(args.url) if args.url else _TestClient(app)
+        local = defaultdict(list)
+        for user_id in ids:
+            try:
+                ok = ceremony(client, authenticator, user_id, tokens[user_id], args.logins, local)
+            except (OSError, http.client.HTTPException):
+                ok = False
+            if not ok:
+                failures.append(user_id)
+        for phase, samples in local.items():
+            timings[phase].extend(samples)
+
+    pool = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+    with QueryCounter(engine) as queries, Timer() as t:
+        for th in pool:
+            th.start()
+        for th in pool:
+            th.join()
+
+    if args.db is None:
+        os.remove(db_path)
+    ceremonies = args.users * (1 + args.logins)
+    return {
+        "users": args.users,
+        "ceremonies": ceremonies,
+        "failures": len(failures),
+        "seconds": round(t.elapsed, 3),
+        "ceremoniesPerSecond": round(ceremonies / t.elapsed, 1),
+        "queriesPerCeremony": None if args.url else round(queries.count / ceremonies, 2),
+        "latencyMs": {
+            phase: {
+                f"p{p}": round(percentile(timings[phase], p) * 1000, 2)
+                for p in (50, 95, 99)
+            }
+            for phase in PHASES if timings[phase]
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--logins", type=int, default=2, help="login ceremonies per registered user")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--url", help="send requests to this server instead of the test client")
+    parser.add_argument("--db", help="SQLite file to seed (required with --url)")
+    parser.add_argument("--origin", help="origin the authenticator reports (default: WEBAUTHN_ORIGIN)")
+    parser.add_argument("--challenge-store", default="database", choices=("database", "memory"))
+    parser.add_argument("--json", action="store_true", help="print the raw result as JSON")
+    args = parser.parse_args()
+    if args.url and not args.db:
+        parser.error("--url needs --db, the SQLite file the server uses")
+    warnings.simplefilter("ignore")
+
+    result = run(args)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"{result['ceremonies']} ceremonies in {result['seconds']}s: "
+          f"{result['ceremoniesPerSecond']} /s, {result['failures']} users failed, "
+          f"{result['queriesPerCeremony']} queries/ceremony")
+    for phase, latency in result["latencyMs"].items():
+        print(f"  {phase:>16}: p50 {latency['p50']}ms  p95 {latency['p95']}ms  p99 {latency['p99']}ms")
+
+
+if __name__ == "__main__":
+    main()
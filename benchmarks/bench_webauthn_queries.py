@@ -0,0 +1,116 @@
+# benchmarks/bench_webauthn_queries.py
+"""
+SQL statements per WebAuthn ceremony phase.
+
+    python benchmarks/bench_webauthn_queries.py --users 200 --credentials 3
+
+Seeds users with placeholder credentials, then calls register/begin,
+login/begin and login/finish for each of them, counting the statements the
+app sends to the database. login/finish is sent a well-formed assertion for
+a stored credential with a dummy signature, so it covers the user and
+credential lookups and stops at signature verification. Each phase runs
+twice per user so the second pass shows the warm-cache cost.
+"""
+import argparse
+import json
+import os
+import warnings
+
+from common import make_app, seed_users, QueryCounter
+
+PHASES = ("register_begin", "login_begin", "login_finish")
+
+
+def _b64(raw: bytes) -> str:
+    from webauthn.helpers import bytes_to_base64url
+    return bytes_to_base64url(raw)
+
+
+def seed_credentials(app, user_ids, per_user: int) -> dict:
+    from sqlalchemy import insert
+    from database import db
+    from models import WebAuthnCredential
+
+    rows = [{
+        "id": os.urandom(32),
+        "user_id": user_id,
+        "public_key": b"placeholder",
+        "counter": 0,
+        "transports": ["usb"],
+    } for user_id in user_ids for _ in range(per_user)]
+    with app.app_context():
+        db.session.execute(insert(WebAuthnCredential), rows)
+        db.session.commit()
+    return {row["user_id"]: row["id"] for row in rows}
+
+
+def dummy_assertion(credential_id: bytes) -> str:
+    return json.dumps({
+        "id": _b64(credential_id),
+        "rawId": _b64(credential_id),
+        "type": "public-key",
+        "response": {
+            "clientDataJSON": _b64(b"{}"),
+            "authenticatorData": _b64(bytes(37)),
+            "signature": _b64(b"\x00"),
+        },
+    })
+
+
+def run(users: int, per_user: int, config: dict) -> dict:
+    from database import db
+    from routes.auth import create_jwt_token
+
+    app, db_path = make_app(**config)
+    user_ids = seed_users(app, users)
+    credential_ids = seed_credentials(app, user_ids, per_user)
+    client = app.test_client()
+    totals = {f"{phase}{suffix}": 0 for phase in PHASES for suffix in ("", "_warm")}
+
+    with app.app_context():
+        engine = db.engine
+        tokens = {user_id: create_jwt_token(str(user_id), "employee") for user_id in user_ids}
+
+    for suffix in ("", "_warm"):
+        for user_id in user_ids:
+            headers = {"Authorization": f"Bearer {tokens[user_id]}"}
+
+            with QueryCounter(engine) as q:
+                client.get("/api/webauthn/register/begin", headers=headers)
+            totals["register_begin" + suffix] += q.count
+
+            with QueryCounter(engine) as q:
+                resp = client.get(f"/api/webauthn/login/begin?userId={user_id}")
+            totals["login_begin" + suffix] += q.count
+            ceremony = resp.get_json()["ceremonyId"]
+
+            with QueryCounter(engine) as q:
+                client.post(
+                    f"/api/webauthn/login/finish?userId={user_id}&ceremonyId={ceremony}",
+                    data=dummy_assertion(credential_ids[user_id]),
+                )
+            totals["login_finish" + suffix] += q.count
+
+    os.remove(db_path)
+    return {phase: round(count / users, 2) for phase, count in totals.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--credentials", type=int, default=3, help="credentials per user")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    for label, config in (
+        ("no cache", {"WEBAUTHN_DESCRIPTOR_CACHE_SIZE": 0, "PRINCIPAL_CACHE_SIZE": 0}),
+        ("cached", {"WEBAUTHN_DESCRIPTOR_CACHE_SIZE": 4096, "PRINCIPAL_CACHE_SIZE": 1024}),
+    ):
+        result = run(args.users, args.credentials, config)
+        print(f"{label:>8}: " + ", ".join(
+            f"{phase}={result[phase]}/{result[phase + '_warm']}" for phase in PHASES
+        ) + "  (queries per call, cold/warm)")
+
+
+if __name__ == "__main__":
+    main()
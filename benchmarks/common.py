@@ -0,0 +1,92 @@
+# benchmarks/common.py
+"""Shared helpers for the scripts in benchmarks/ (run them from the repo root)."""
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def make_app(db_path: str = None, **config):
+    """Fresh app on its own SQLite file (a temp file unless `db_path` is given)."""
+    if db_path is None:
+        fd, db_path = tempfile.mkstemp(prefix="clockin-bench-", suffix=".db")
+        os.close(fd)
+        os.remove(db_path)
+    uri = f"sqlite:///{db_path}"
+    # app.py builds a module-level app from DATABASE_URL on import
+    os.environ.setdefault("DATABASE_URL", uri)
+    from app import create_app
+    app = create_app({"SQLALCHEMY_DATABASE_URI": uri, **config})
+    return app, db_path
+
+
+def seed_users(app, count: int, departments=("Production", "Warehouse", "Sales", "Office")):
+    """Insert `count` active employees with a placeholder hash; returns their ids."""
+    import uuid
+    from datetime import datetime
+    from sqlalchemy import insert
+    from database import db
+    from models import User
+
+    now = datetime.utcnow()
+    rows = [{
+        "id": uuid.uuid4(),
+        "name": f"Bench User {i:06d}",
+        "email": f"bench{i:06d}@example.com",
+        "password_hash": "!",
+        "role": "employee",
+        "department": departments[i % len(departments)],
+        "status": "Active",
+        "created_at": now,
+        "updated_at": now,
+    } for i in range(count)]
+    with app.app_context():
+        db.session.execute(insert(User), rows)
+        db.session.commit()
+    return [r["id"] for r in rows]
+
+
+def admin_headers(client, email="admin@pardeefoods.com", password="Admin@123"):
+    resp = client.post("/api/auth/login", json={"email": email, "password": password})
+    return {"Authorization": "Bearer " + resp.get_json()["token"]}
+
+
+def percentile(samples, pct: float):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+class QueryCounter:
+    """Counts statements sent to `engine` while active (use as a context manager)."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _count(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        from sqlalchemy import event
+        event.listen(self.engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc):
+        from sqlalchemy import event
+        event.remove(self.engine, "before_cursor_execute", self._count)
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
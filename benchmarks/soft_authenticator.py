@@ -0,0 +1,132 @@
+# benchmarks/soft_authenticator.py
+"""
+Software WebAuthn authenticator for load tests.
+
+Produces registration ("none" attestation) and authentication responses
+that the webauthn library verifies like those of a real platform
+authenticator: an ES256 (P-256) key pair per credential, authenticator
+data with the user-present and user-verified flags, and a sign counter
+that increases on every assertion. Never use it outside tests.
+
+    authenticator = SoftAuthenticator(origin="https://clockin-pi.vercel.app")
+    attestation = authenticator.create(registration_options)   # JSON str
+    assertion = authenticator.get(authentication_options)      # JSON str
+"""
+import hashlib
+import json
+import os
+import struct
+import threading
+
+import cbor2
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec
+from webauthn.helpers import base64url_to_bytes, bytes_to_base64url
+
+FLAG_USER_PRESENT = 0x01
+FLAG_USER_VERIFIED = 0x04
+FLAG_ATTESTED_CREDENTIAL = 0x40
+AAGUID = bytes(16)
+
+
+class _Credential:
+    __slots__ = ("id", "rp_id", "user_handle", "key", "counter")
+
+    def __init__(self, rp_id: str, user_handle: bytes):
+        self.id = os.urandom(32)
+        self.rp_id = rp_id
+        self.user_handle = user_handle
+        self.key = ec.generate_private_key(ec.SECP256R1())
+        self.counter = 0
+
+    def cose_public_key(self) -> bytes:
+        numbers = self.key.public_key().public_numbers()
+        return cbor2.dumps({
+            1: 2,    # kty: EC2
+            3: -7,   # alg: ES256
+            -1: 1,   # crv: P-256
+            -2: numbers.x.to_bytes(32, "big"),
+            -3: numbers.y.to_bytes(32, "big"),
+        })
+
+
+class SoftAuthenticator:
+    """Holds any number of credentials, across users and relying parties. Thread-safe."""
+
+    def __init__(self, origin: str):
+        self.origin = origin
+        self._credentials = {}
+        self._lock = threading.Lock()
+
+    # ---------- Registration ----------
+    def create(self, options) -> str:
+        """Answer PublicKeyCredentialCreationOptions (dict or JSON) with a new credential."""
+        options = json.loads(options) if isinstance(options, (str, bytes)) else options
+        rp_id = options["rp"]["id"]
+        cred = _Credential(rp_id, base64url_to_bytes(options["user"]["id"]))
+        with self._lock:
+            self._credentials[cred.id] = cred
+
+        client_data = self._client_data("webauthn.create", options["challenge"])
+        attested = AAGUID + struct.pack(">H", len(cred.id)) + cred.id + cred.cose_public_key()
+        auth_data = self._auth_data(
+            rp_id, FLAG_USER_PRESENT | FLAG_USER_VERIFIED | FLAG_ATTESTED_CREDENTIAL, cred.counter
+        ) + attested
+        attestation_object = cbor2.dumps({"fmt": "none", "attStmt": {}, "authData": auth_data})
+
+        return json.dumps({
+            "id": bytes_to_base64url(cred.id),
+            "rawId": bytes_to_base64url(cred.id),
+            "type": "public-key",
+            "response": {
+                "clientDataJSON": bytes_to_base64url(client_data),
+                "attestationObject": bytes_to_base64url(attestation_object),
+                "transports": ["internal"],
+            },
+            "clientExtensionResults": {},
+            "authenticatorAttachment": "platform",
+        })
+
+    # ---------- Authentication ----------
+    def get(self, options) -> str:
+        """Answer PublicKeyCredentialRequestOptions (dict or JSON) with an assertion."""
+        options = json.loads(options) if isinstance(options, (str, bytes)) else options
+        rp_id = options["rpId"]
+        allowed = [base64url_to_bytes(c["id"]) for c in options.get("allowCredentials") or ()]
+        with self._lock:
+            cred = next((self._credentials[i] for i in allowed if i in self._credentials), None)
+            if cred is None:
+                raise LookupError("No matching credential on this authenticator")
+            cred.counter += 1
+            counter = cred.counter
+
+        client_data = self._client_data("webauthn.get", options["challenge"])
+        auth_data = self._auth_data(rp_id, FLAG_USER_PRESENT | FLAG_USER_VERIFIED, counter)
+        signature = cred.key.sign(auth_data + hashlib.sha256(client_data).digest(), ec.ECDSA(hashes.SHA256()))
+
+        return json.dumps({
+            "id": bytes_to_base64url(cred.id),
+            "rawId": bytes_to_base64url(cred.id),
+            "type": "public-key",
+            "response": {
+                "clientDataJSON": bytes_to_base64url(client_data),
+                "authenticatorData": bytes_to_base64url(auth_data),
+                "signature": bytes_to_base64url(signature),
+                "userHandle": bytes_to_base64url(cred.user_handle),
+            },
+            "clientExtensionResults": {},
+            "authenticatorAttachment": "platform",
+        })
+
+    # ---------- Internals ----------
+    def _client_data(self, typ: str, challenge: str) -> bytes:
+        return json.dumps({
+            "type": typ,
+            "challenge": challenge,
+            "origin": self.origin,
+            "crossOrigin": False,
+        }, separators=(",", ":")).encode()
+
+    @staticmethod
+    def _auth_data(rp_id: str, flags: int, counter: int) -> bytes:
+        return hashlib.sha256(rp_id.encode()).digest() + bytes([flags]) + struct.pack(">I", counter)
@@ -0,0 +1,140 @@
+# commands.py
+import click
+from datetime import datetime
+
+
+def _parse_day(value):
+    return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+
+
+def register_commands(app):
+    """Attach maintenance commands to `flask --app app <command>`."""
+
+    @app.cli.command("init-db")
+    def init_db_command():
+        """Create or upgrade tables, indexes and the search index, and seed the default admin."""
+        from database import prepare_database
+        report = prepare_database(app)
+        click.echo(f"schema up to date (user search: {report['userSearch']})")
+        if report["adminCreated"]:
+            click.echo("default admin created: admin@pardeefoods.com (change its password)")
+        if report["summaryRows"]:
+            click.echo(f"daily_attendance_summary backfilled: {report['summaryRows']} rows")
+
+    @app.cli.command("rebuild-summary")
+    @click.option("--from", "start", help="First date to rebuild (YYYY-MM-DD). Default: all.")
+    @click.option("--to", "end", help="Last date to rebuild (YYYY-MM-DD). Default: all.")
+    def rebuild_summary(start, end):
+        """Regenerate daily_attendance_summary from attendance_records."""
+        from services.attendance_summary import rebuild
+        rows = rebuild(_parse_day(start), _parse_day(end))
+        click.echo(f"daily_attendance_summary rebuilt: {rows} rows")
+
+    @app.cli.command("calibrate-bcrypt")
+    @click.option("--budget-ms", default=250.0, show_default=True,
+                  help="Login p99 budget for one password verification.")
+    @click.option("--samples", default=5, show_default=True, help="Hashes timed per cost.")
+    def calibrate_bcrypt(budget_ms, samples):
+        """Measure bcrypt latency per cost on this host and recommend BCRYPT_LOG_ROUNDS."""
+        from services.passwords import calibrate, password_hasher
+
+        budget = budget_ms / 1000
+        recommended = None
+        click.echo("cost  median_ms  max_ms")
+        for cost, median, worst in calibrate(range(4, 17), samples, give_up_after=budget * 4):
+            fits = worst <= budget
+            click.echo(f"{cost:>4}  {median * 1000:>9.1f}  {worst * 1000:>6.1f}{'  ok' if fits else ''}")
+            if fits:
+                recommended = cost
+
+        click.echo(f"current BCRYPT_LOG_ROUNDS: {password_hasher.target_cost}")
+        if recommended is None:
+            click.echo("no cost fits the budget; raise --budget-ms")
+        else:
+            click.echo(f"recommended BCRYPT_LOG_ROUNDS: {recommended} (budget {budget_ms:g} ms)")
+
+    @app.cli.command("migrate-guids")
+    @click.option("--to", "to", type=click.Choice(["binary", "text"]), required=True,
+                  help="Target storage for GUID columns.")
+    @click.option("--batch-size", default=5000, show_default=True, help="Rows per UPDATE batch.")
+    def migrate_guids(to, batch_size):
+        """Convert SQLite GUID columns between 36-char text and 16-byte binary (app stopped)."""
+        import os
+        from database import db
+        from services.guid_migration import migrate
+
+        path = db.engine.url.database
+        before = os.path.getsize(path) if path and os.path.exists(path) else None
+        try:
+            converted = migrate(db.engine, db.metadata, to, batch_size)
+        except ValueError as exc:
+            raise click.ClickException(str(exc))
+        for column, rows in converted.items():
+            click.echo(f"{column}: {rows} rows converted")
+        if before is not None:
+            click.echo(f"database size: {before / 1e6:.1f} MB -> {os.path.getsize(path) / 1e6:.1f} MB")
+        click.echo(f"set GUID_STORAGE={to} before starting the app")
+
+    @app.cli.command("seed")
+    @click.option("--users", default=1000, show_default=True, help="Employees to create.")
+    @click.option("--days", default=90, show_default=True, help="Days of attendance history per employee.")
+    @click.option("--until", "end", help="Last seeded day (YYYY-MM-DD). Default: yesterday.")
+    @click.option("--absent-rate", default=0.08, show_default=True, help="Share of working days absent.")
+    @click.option("--late-rate", default=0.12, show_default=True, help="Share of clock-ins after LATE_CUTOFF.")
+    @click.option("--missing-clock-out-rate", default=0.03, show_default=True,
+                  help="Share of days without a clock-out.")
+    @click.option("--webauthn-rate", default=0.4, show_default=True,
+                  help="Share of employees with WebAuthn credentials.")
+    @click.option("--weekends/--no-weekends", default=False, show_default=True, help="Seed Saturdays and Sundays.")
+    @click.option("--random-seed", type=int, help="Make the generated data reproducible.")
+    @click.option("--bcrypt-cost", type=int, help="Cost of the shared password hash. Default: BCRYPT_LOG_ROUNDS.")
+    def seed_data(users, days, end, absent_rate, late_rate, missing_clock_out_rate, webauthn_rate,
+                  weekends, random_seed, bcrypt_cost):
+        """Insert synthetic employees, attendance history and WebAuthn credentials (not for production)."""
+        from services.seed import SEED_PASSWORD, seed
+
+        counts = seed(
+            users, days, _parse_day(end),
+            absent_rate=absent_rate,
+            late_rate=late_rate,
+            missing_clock_out_rate=missing_clock_out_rate,
+            webauthn_rate=webauthn_rate,
+            weekends=weekends,
+            rng_seed=random_seed,
+            bcrypt_cost=bcrypt_cost,
+        )
+        for table, rows in counts.items():
+            click.echo(f"{table}: {rows} rows")
+        click.echo(f"seeded users sign in with password {SEED_PASSWORD}")
+
+    @app.cli.command("import-employees")
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--bcrypt-cost", type=int,
+                  help="Cost of the imported hashes (logins rehash them). Default: IMPORT_BCRYPT_LOG_ROUNDS.")
+    @click.option("--errors/--no-errors", default=True, show_default=True, help="List the rows that failed.")
+    def import_employees_command(path, bcrypt_cost, errors):
+        """Bulk-import employees from a CSV or JSON file, without the HTTP route's size caps."""
+        import json
+        from services import employee_import
+
+        with open(path, "rb") as fh:
+            data = fh.read()
+        try:
+            if path.lower().endswith(".json"):
+                rows = json.loads(data)
+                rows = rows.get("employees") if isinstance(rows, dict) else rows
+            else:
+                rows = employee_import.parse_csv(data)
+        except ValueError as exc:
+            raise click.ClickException(str(exc))
+        if not isinstance(rows, list):
+            raise click.ClickException("Expected a list of employees")
+
+        if bcrypt_cost:
+            app.config["IMPORT_BCRYPT_LOG_ROUNDS"] = bcrypt_cost
+        report = employee_import.import_employees(rows)
+        failed = [r for r in report if r["status"] != "created"]
+        click.echo(f"created: {len(report) - len(failed)}, failed: {len(failed)}")
+        if errors:
+            for r in failed:
+                click.echo(f"  row {r['row']} ({r['email']}): {r['error']}")
@@ -1,14 +1,246 @@
 # database.py
+import os
+import threading
+import time
+import logging
+from functools import wraps
+from flask import current_app, g, has_request_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as FlaskSession
 from flask_bcrypt import Bcrypt
 from sqlalchemy import event
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import QueuePool
 import sqlite3
 
+# Bind key of the optional read-only engine
+READ_REPLICA = "replica"
+
+# monotonic time of the last commit on the primary engine (this process)
+_last_primary_commit = 0.0
+
+
+class RoutingSession(FlaskSession):
+    """
+    Session that sends reads to the read replica bind during requests that
+    opted in (see use_read_replica). Flushes, DML statements and reads within
+    REPLICA_STALENESS_SECONDS of a commit on the primary stay on the primary.
+    The commit clock is per process, so it guards a worker's own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._replica_allowed(clause):
+            return self._db.engines[READ_REPLICA]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _replica_allowed(self, clause) -> bool:
+        if not (has_request_context() and g.get("db_read_replica")):
+            return False
+        if self._flushing or (clause is not None and getattr(clause, "is_dml", False)):
+            return False
+        if READ_REPLICA not in self._db.engines:
+            return False
+        # Staleness guard: the replica may not have caught up with a fresh write
+        window = float(current_app.config.get("REPLICA_STALENESS_SECONDS", 1.0))
+        return time.monotonic() - _last_primary_commit >= window
+
+
 # Import inside functions later to avoid circular import
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 bcrypt = Bcrypt()
 
+logger = logging.getLogger(__name__)
+
+# PRAGMAs applied to every new SQLite connection, per SQLITE_PROFILE
+SQLITE_PROFILES = {
+    # Rollback journal, SQLite defaults; only enforce foreign keys
+    "default": {
+        "foreign_keys": "ON",
+    },
+    # WAL lets report readers run alongside the clock-in writer
+    "performance": {
+        "foreign_keys": "ON",
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",     # durable at checkpoints; safe with WAL
+        "busy_timeout": 5000,        # ms to wait for the writer lock instead of failing
+        "mmap_size": 268435456,      # 256 MiB of the file memory-mapped
+        "cache_size": -65536,        # 64 MiB page cache (negative = KiB)
+        "temp_store": "MEMORY",
+    },
+}
+
+
+# ---------- Connection pool ----------
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait to check out a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait_stats.record(time.perf_counter() - start)
+
+
+class PoolWaitStats:
+    def __init__(self):
+        self.warn_after = float(os.environ.get("DB_POOL_WAIT_WARN_MS", 100)) / 1000
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.slow_checkouts = 0
+        self.observers = []  # callables(waited_seconds), e.g. metrics histograms
+        self._lock = threading.Lock()
+
+    def record(self, waited: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            if waited >= self.warn_after:
+                self.slow_checkouts += 1
+        for observe in self.observers:
+            observe(waited)
+        if waited >= self.warn_after:
+            logger.warning("DB pool checkout waited %.1f ms", waited * 1000)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "avgWaitMs": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else None,
+                "maxWaitMs": round(self.max_wait * 1000, 3),
+                "slowCheckouts": self.slow_checkouts,
+            }
+
+
+def pool_stats(engine=None) -> dict:
+    """Pool occupancy and checkout wait times for `engine` (default: the primary engine)."""
+    pool = (engine or db.engine).pool
+    stats = {"class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checkedOut": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "idle": pool.checkedin(),
+        })
+    if isinstance(pool, TimedQueuePool):
+        stats.update(pool.wait_stats.as_dict())
+    return stats
+
+
+# ---------- Read replica routing ----------
+def route_to_read_replica():
+    """Mark the current request's reads as replica-safe (usable as a before_request hook)."""
+    g.db_read_replica = True
+
+
+def use_read_replica(f):
+    """Decorator: run a read-only view against the read replica when one is configured."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        route_to_read_replica()
+        return f(*args, **kwargs)
+    return decorated
+
+
+def _read_replica_uri(app):
+    """
+    DATABASE_READ_URL: a replica URI, or "ro" to open the primary SQLite
+    file a second time in read-only mode (mode=ro).
+    """
+    uri = app.config.get("SQLALCHEMY_READ_URI", os.environ.get("DATABASE_READ_URL"))
+    if uri != "ro":
+        return uri
+    primary = make_url(app.config["SQLALCHEMY_DATABASE_URI"])
+    if primary.get_backend_name() != "sqlite" or not primary.database:
+        raise ValueError("DATABASE_READ_URL=ro requires a file-backed SQLite primary")
+    path = primary.database
+    if not os.path.isabs(path):
+        path = os.path.join(app.instance_path, path)
+    return f"sqlite:///file:{path}?mode=ro&uri=true"
+
+
+def _mark_primary_commit(conn):
+    global _last_primary_commit
+    _last_primary_commit = time.monotonic()
+
+
+def _engine_defaults(app, uri: str = None) -> dict:
+    """
+    Pool settings by backend. Sync gunicorn workers serve one request at a
+    time, so a small per-worker pool (DB_POOL_SIZE) is enough; threaded
+    workers should size it to their thread count.
+    """
+    url = make_url(uri or app.config["SQLALCHEMY_DATABASE_URI"])
+    pool_size = int(app.config.get("DB_POOL_SIZE", os.environ.get("DB_POOL_SIZE", 5)))
+    max_overflow = int(app.config.get("DB_MAX_OVERFLOW", os.environ.get("DB_MAX_OVERFLOW", 10)))
+    pool_timeout = float(app.config.get("DB_POOL_TIMEOUT", os.environ.get("DB_POOL_TIMEOUT", 30)))
+
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:") or url.query.get("mode") == "memory":
+            return {}  # in-memory databases keep SQLAlchemy's single-connection pool
+        return {
+            "poolclass": TimedQueuePool,
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_timeout": pool_timeout,
+        }
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": pool_timeout,
+        "pool_pre_ping": True,
+        "pool_recycle": int(app.config.get("DB_POOL_RECYCLE", os.environ.get("DB_POOL_RECYCLE", 1800))),
+    }
+
+
+def _sqlite_pragmas(app) -> dict:
+    profile = app.config.get("SQLITE_PROFILE", os.environ.get("SQLITE_PROFILE", "performance"))
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLITE_PROFILE {profile!r} (choose from {', '.join(SQLITE_PROFILES)})")
+    return SQLITE_PROFILES[profile]
+
+
+def _guid_storage(app) -> str:
+    storage = app.config.get("GUID_STORAGE", os.environ.get("GUID_STORAGE", "text"))
+    if storage not in ("text", "binary"):
+        raise ValueError(f"Unknown GUID_STORAGE {storage!r} (use 'text' or 'binary')")
+    return storage
+
+
+def _check_guid_storage(storage: str):
+    """Refuse to start when existing SQLite ids are stored differently from GUID_STORAGE."""
+    if db.engine.dialect.name != "sqlite":
+        return
+    with db.engine.connect() as conn:
+        actual = conn.exec_driver_sql("SELECT typeof(id) FROM users LIMIT 1").scalar()
+    if actual and actual != ("blob" if storage == "binary" else "text"):
+        raise RuntimeError(
+            f"users.id is stored as {actual} but GUID_STORAGE={storage}; "
+            f"run `GUID_STORAGE={'binary' if actual == 'blob' else 'text'} flask --app app migrate-guids "
+            f"--to {storage}` first"
+        )
+
+
+def _ensure_indexes():
+    """create_all skips existing tables; add indexes declared on models since they were created."""
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+
 
 def init_db(app):
     """
@@ -17,25 +249,76 @@ def init_db(app):
         from database import init_db
         init_db(app)
     """
+    engine_options = _engine_defaults(app)
+    engine_options.update(app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}))
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options
+
+    read_uri = _read_replica_uri(app)
+    if read_uri:
+        binds = app.config.setdefault("SQLALCHEMY_BINDS", {})
+        binds.setdefault(READ_REPLICA, {"url": read_uri, **_engine_defaults(app, read_uri)})
+
     db.init_app(app)
     bcrypt.init_app(app)
 
-    # Enable foreign key constraints in SQLite
-    @event.listens_for(Engine, "connect")
-    def _set_sqlite_pragma(dbapi_connection, connection_record):
-        # Only for SQLite
-        if isinstance(dbapi_connection, sqlite3.Connection):
-            cursor = dbapi_connection.cursor()
-            cursor.execute("PRAGMA foreign_keys = ON")
-            cursor.close()
+    # Apply the SQLite PRAGMA profile on every new connection of this app's engines
+    pragmas = _sqlite_pragmas(app)
+
+    def _pragma_listener(read_only: bool):
+        def _set_sqlite_pragma(dbapi_connection, connection_record):
+            # Only for SQLite
+            if isinstance(dbapi_connection, sqlite3.Connection):
+                cursor = dbapi_connection.cursor()
+                for name, value in pragmas.items():
+                    try:
+                        cursor.execute(f"PRAGMA {name} = {value}")
+                    except sqlite3.OperationalError:
+                        # e.g. journal_mode on a mode=ro connection; the primary sets it
+                        if not read_only:
+                            raise
+                cursor.close()
+        return _set_sqlite_pragma
 
-    # Create tables and seed default admin if needed
+    # models.GUID reads its storage mode (36-char text or 16 raw bytes) from the dialect
+    guid_storage = _guid_storage(app)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dialect.guid_storage = guid_storage
+        event.listen(db.engine, "connect", _pragma_listener(read_only=False))
+        event.listen(db.engine, "commit", _mark_primary_commit)
+        if READ_REPLICA in db.engines:
+            event.listen(db.engines[READ_REPLICA], "connect", _pragma_listener(read_only=True))
+
+    # Schema creation and the admin seed run here only when DB_AUTO_INIT is
+    # on; deployments run `flask --app app init-db` once instead, so worker
+    # boot never touches the database
+    auto_init = app.config.get("DB_AUTO_INIT", os.environ.get("DB_AUTO_INIT", "1"))
+    if str(auto_init).lower() in ("1", "true", "yes"):
+        prepare_database(app)
+
+
+def prepare_database(app) -> dict:
+    """
+    Create or upgrade the schema and seed the default admin (idempotent).
+    Returns what was done, for the init-db command.
+    """
+    from models import User  # import here to avoid circular deps
+    from services.attendance_summary import ensure_populated
+    from services.user_search import init_user_search
+
+    report = {}
     with app.app_context():
-        from models import User  # import here to avoid circular deps
         db.create_all()
+        _ensure_indexes()
+        _check_guid_storage(_guid_storage(app))
+
+        # Name/email/department search index (FTS5, pg_trgm or none)
+        report["userSearch"] = init_user_search(app)
 
         # Check if an admin already exists
         admin = User.query.filter_by(role="admin").first()
+        report["adminCreated"] = False
         if not admin:
             admin = User(
                 name="System Admin",
@@ -46,5 +329,25 @@ def init_db(app):
             )
             admin.set_password("Admin@123")  # default password
             db.session.add(admin)
-            db.session.commit()
-            app.logger.info("Default admin user created: admin@pardeefoods.com / Admin@123")
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Another process seeded it first
+                db.session.rollback()
+            else:
+                report["adminCreated"] = True
+                app.logger.info("Default admin user created: admin@pardeefoods.com / Admin@123")
+
+    # Backfill the daily attendance rollup for databases created before it existed
+    report["summaryRows"] = ensure_populated(app)
+    return report
+
+
+def dispose_engines(app):
+    """
+    Drop pooled connections inherited over fork (gunicorn post_fork with
+    preload_app) without closing them, which would break the parent's.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -0,0 +1,43 @@
+# gunicorn.conf.py -- read automatically by `gunicorn app:app` from this directory
+import os
+import shutil
+import tempfile
+import time
+
+# Import the app once in the master and fork workers from it (GUNICORN_PRELOAD=0 to disable).
+# Workers then start in milliseconds and share the imported code pages.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1").lower() in ("1", "true", "yes")
+
+# Workers share one response cache file, so a write in any of them invalidates all (services/response_cache.py)
+os.environ.setdefault("RESPONSE_CACHE", "sqlite")
+
+# Workers share one directory of Prometheus samples (services/metrics.py)
+if os.environ.get("METRICS_ENABLED", "0").lower() in ("1", "true", "yes"):
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "clockin-metrics"))
+
+
+def on_starting(server):
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        # Samples from a previous run would be added to this one's
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def post_fork(server, worker):
+    worker.boot_started = time.perf_counter()
+    if server.cfg.preload_app:
+        # Connections opened in the master must not be shared with the children
+        from app import app
+        from database import dispose_engines
+        dispose_engines(app)
+
+
+def post_worker_init(worker):
+    # Cold start: fork to ready to accept requests (includes importing the app without preload)
+    worker.log.info("Worker %s ready in %.1f ms", worker.pid, (time.perf_counter() - worker.boot_started) * 1000)
+
+
+def child_exit(server, worker):
+    from services.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
@@ -2,36 +2,67 @@
 import uuid
 from datetime import datetime
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.types import TypeDecorator, BLOB, String
+from sqlalchemy.types import TypeDecorator, BLOB, BINARY, LargeBinary, String
 from sqlalchemy import CheckConstraint, JSON
-from database import db, bcrypt
+from database import db
+from services.passwords import password_hasher
 
 
 # ---------- UUID Support for SQLite ----------
+_new_object = object.__new__
+_set_attribute = object.__setattr__
+
+
+def _uuid_from_int(value: int) -> uuid.UUID:
+    """Build a UUID from its 128-bit int, skipping UUID.__init__ argument parsing (values come from our own columns)."""
+    u = _new_object(uuid.UUID)
+    _set_attribute(u, "int", value)
+    _set_attribute(u, "is_safe", uuid.SafeUUID.unknown)
+    return u
+
+
 class GUID(TypeDecorator):
     """
     Platform-independent GUID/UUID type.
-    Uses PostgreSQL UUID type, otherwise stores as string.
+    Uses PostgreSQL UUID type, otherwise stores as string (36 chars), or as
+    16 raw bytes when the engine's dialect has guid_storage = "binary"
+    (set by init_db from GUID_STORAGE).
     """
     impl = String
+    cache_ok = True
 
     def load_dialect_impl(self, dialect):
         if dialect.name == "postgresql":
             return dialect.type_descriptor(UUID(as_uuid=True))
-        else:
-            return dialect.type_descriptor(String(36))
+        if _binary(dialect):
+            return dialect.type_descriptor(BINARY(16) if dialect.name == "mysql" else LargeBinary(16))
+        return dialect.type_descriptor(String(36))
 
     def process_bind_param(self, value, dialect):
-        if value is None:
+        if value is None or dialect.name == "postgresql" and isinstance(value, uuid.UUID):
             return value
-        if not isinstance(value, uuid.UUID):
-            return str(uuid.UUID(value))
-        return str(value)
+        if _binary(dialect):
+            if isinstance(value, uuid.UUID):
+                return value.bytes
+            if isinstance(value, bytes) and len(value) == 16:
+                return value
+            return uuid.UUID(value).bytes
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        if isinstance(value, bytes) and len(value) == 16:
+            return str(_uuid_from_int(int.from_bytes(value, "big")))
+        return str(uuid.UUID(value))
 
     def process_result_value(self, value, dialect):
-        if value is None:
+        if value is None or isinstance(value, uuid.UUID):
             return value
-        return uuid.UUID(value)
+        if isinstance(value, bytes):
+            return _uuid_from_int(int.from_bytes(value, "big"))
+        return _uuid_from_int(int(value.replace("-", ""), 16))
+
+
+def _binary(dialect) -> bool:
+    return getattr(dialect, "guid_storage", "text") == "binary"
 
 
 # ---------- Users Table ----------
@@ -61,12 +92,22 @@ class User(db.Model):
         CheckConstraint(status.in_(["Active", "Inactive"]), name="check_status"),
     )
 
-    # Password helpers
+    # Password helpers (bcrypt runs on the bounded hasher pool)
     def set_password(self, password: str):
-        self.password_hash = bcrypt.generate_password_hash(password).decode("utf-8")
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password: str) -> bool:
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def rehash_password_if_needed(self, password: str) -> bool:
+        """
+        Re-hash a just-verified password when its bcrypt cost differs from
+        BCRYPT_LOG_ROUNDS. Returns True if the hash changed (caller commits).
+        """
+        if not password_hasher.needs_rehash(self.password_hash):
+            return False
+        self.set_password(password)
+        return True
 
 
 # ---------- Attendance Records ----------
@@ -80,13 +121,32 @@ class AttendanceRecord(db.Model):
     clock_out = db.Column(db.DateTime, nullable=True)
     total_hours = db.Column(db.Numeric(4, 2), nullable=True)
 
-    user = db.relationship("User", backref="attendance_records", lazy=True)
+    # passive_deletes: let ON DELETE CASCADE remove records when a user is deleted
+    user = db.relationship("User", backref=db.backref("attendance_records", passive_deletes=True), lazy=True)
 
     __table_args__ = (
         db.UniqueConstraint("user_id", "date", name="unique_user_date"),
+        # Date-range scans (reports, exports) group and filter by date first
+        db.Index("ix_attendance_records_date_user", "date", "user_id"),
     )
 
 
+# ---------- Daily Attendance Rollup ----------
+class DailyAttendanceSummary(db.Model):
+    """
+    Per-day, per-department attendance totals, maintained by
+    services.attendance_summary alongside every clock-in/clock-out.
+    """
+    __tablename__ = "daily_attendance_summary"
+
+    date = db.Column(db.Date, primary_key=True)
+    department = db.Column(db.String(255), primary_key=True)
+    present_count = db.Column(db.Integer, nullable=False, default=0)
+    late_count = db.Column(db.Integer, nullable=False, default=0)
+    completed_count = db.Column(db.Integer, nullable=False, default=0)
+    total_hours = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+
+
 # ---------- WebAuthn Credentials ----------
 class WebAuthnCredential(db.Model):
     __tablename__ = "webauthn_credentials"
@@ -98,4 +158,16 @@ class WebAuthnCredential(db.Model):
     transports = db.Column(JSON, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
-    user = db.relationship("User", backref="webauthn_credentials", lazy=True)
+    user = db.relationship("User", backref=db.backref("webauthn_credentials", passive_deletes=True), lazy=True)
+
+
+# ---------- WebAuthn Ceremony Challenges ----------
+class WebAuthnChallenge(db.Model):
+    """Pending register/login challenges for the database-backed challenge store."""
+    __tablename__ = "webauthn_challenges"
+
+    id = db.Column(db.String(64), primary_key=True)  # opaque ceremony id
+    challenge = db.Column(db.String(255), nullable=False)  # base64url
+    user_id = db.Column(GUID(), nullable=True)
+    purpose = db.Column(db.String(16), nullable=False)  # "registration" | "authentication"
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
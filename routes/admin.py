@@ -1,15 +1,28 @@
-from flask import Blueprint, request, jsonify
-from datetime import date, datetime, time as dt_time
-from sqlalchemy import func, distinct
-from database import db
-from models import User, AttendanceRecord
+import uuid
+from flask import Blueprint, request, jsonify, current_app
+from datetime import date, datetime
+from sqlalchemy import func, or_, and_
+from database import db, pool_stats, use_read_replica, READ_REPLICA
+from models import User, AttendanceRecord, DailyAttendanceSummary
 from routes.auth import roles_required
+from services.principal_cache import principal_cache
+from services.credential_cache import descriptor_cache
+from services.group_commit import group_committer
+from services.passwords import password_hasher
+from services.query_stats import query_instrumentation
+from services.response_cache import cached_response, response_cache
+from services import employee_import
+from services.pagination import encode_cursor, decode_cursor
+from services.serializers import RowSerializer, iso, text
+from services.directory import DirectoryView
+from services.user_search import user_search_clause
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/api/admin")
 
 # ---------------- Dashboard ---------------- #
 @admin_bp.route("/dashboard", methods=["GET"])
 @roles_required("admin")
+@cached_response
 def dashboard():
     today = date.today()
 
@@ -17,22 +30,11 @@ def dashboard():
     total_employees = db.session.query(func.count(User.id))\
         .filter(func.lower(User.status) == "active").scalar() or 0
 
-    # Count users who have clocked in today
-    present_today = db.session.query(func.count(distinct(AttendanceRecord.user_id)))\
-        .filter(AttendanceRecord.date == today).scalar() or 0
-
-    # Fetch all clock-ins for late calculation
-    records_today = db.session.query(AttendanceRecord.clock_in)\
-        .filter(AttendanceRecord.date == today, AttendanceRecord.clock_in.isnot(None)).all()
-
-    late_count = 0
-    cutoff = dt_time(9, 0, 0)
-    for (clock_in,) in records_today:
-        if clock_in:
-            # handle datetime or string
-            time_val = getattr(clock_in, "time", lambda: clock_in)()
-            if time_val > cutoff:
-                late_count += 1
+    # Present and late counts for today come from the daily rollup
+    present_today, late_count = db.session.query(
+        func.coalesce(func.sum(DailyAttendanceSummary.present_count), 0),
+        func.coalesce(func.sum(DailyAttendanceSummary.late_count), 0),
+    ).filter(DailyAttendanceSummary.date == today).one()
 
     absent_today = max(total_employees - present_today, 0)
 
@@ -44,11 +46,27 @@ def dashboard():
     }), 200
 
 # ---------------- Attendance Logs ---------------- #
+# Columns in the order attendance_logs SELECTs them
+ATTENDANCE_LOG_ROW = RowSerializer(
+    ("id", text), ("userId", text), "userName", ("date", iso), ("clockIn", iso), ("clockOut", iso),
+    ("totalHours", float),
+)
+
 @admin_bp.route("/attendance-logs", methods=["GET"])
 @roles_required("admin", "hr")
+@use_read_replica
 def attendance_logs():
+    """
+    GET /api/admin/attendance-logs?date=&search=
+    Two paging modes:
+    - page/per_page (legacy): OFFSET paging with an exact total.
+    - cursor (pass an empty cursor for the first page): keyset paging on
+      (date desc, user name, record id). meta.next_cursor is null on the
+      last page; the exact total is only computed when withTotal=1.
+    """
     q_date = request.args.get("date")
     search = request.args.get("search", "").strip()
+    cursor = request.args.get("cursor")
     try:
         page = int(request.args.get("page", 1))
         per_page = int(request.args.get("per_page", 50))
@@ -75,41 +93,60 @@ def attendance_logs():
             return jsonify({"error": "Invalid date format (use YYYY-MM-DD)"}), 400
 
     if search:
-        query = query.filter(User.name.ilike(f"%{search}%"))
+        query = query.filter(user_search_clause(search, columns=("name",)))
 
-    query = query.order_by(AttendanceRecord.date.desc(), User.name.asc())
+    # Record id breaks ties so every row has a unique, stable position
+    ordered = query.order_by(AttendanceRecord.date.desc(), User.name.asc(), AttendanceRecord.id.asc())
 
-    total = query.count()
-    items = query.limit(per_page).offset((page - 1) * per_page).all()
-
-    results = [{
-        "id": str(rec.id),
-        "userId": str(rec.user_id),
-        "userName": rec.userName,
-        "date": rec.date.isoformat() if rec.date else None,
-        "clockIn": rec.clock_in.isoformat() if rec.clock_in else None,
-        "clockOut": rec.clock_out.isoformat() if rec.clock_out else None,
-        "totalHours": float(rec.total_hours) if rec.total_hours is not None else None
-    } for rec in items]
+    if cursor is None:
+        total = query.count()
+        items = ordered.limit(per_page).offset((page - 1) * per_page).all()
+        meta = {"total": total, "page": page, "per_page": per_page}
+    else:
+        if cursor:
+            try:
+                c_date, c_name, c_id = decode_cursor(cursor, 3)
+                c_date = date.fromisoformat(c_date)
+                c_id = uuid.UUID(c_id)
+            except (ValueError, TypeError, AttributeError):
+                return jsonify({"error": "Invalid cursor"}), 400
+            ordered = ordered.filter(or_(
+                AttendanceRecord.date < c_date,
+                and_(AttendanceRecord.date == c_date, or_(
+                    User.name > c_name,
+                    and_(User.name == c_name, AttendanceRecord.id > c_id),
+                )),
+            ))
+        items = ordered.limit(per_page + 1).all()
+        has_more = len(items) > per_page
+        items = items[:per_page]
+        last = items[-1] if items else None
+        meta = {
+            "per_page": per_page,
+            "next_cursor": encode_cursor([last.date.isoformat(), last.userName, str(last.id)]) if has_more else None,
+        }
+        if request.args.get("withTotal", "").lower() in ("1", "true"):
+            meta["total"] = query.count()
 
     return jsonify({
-        "meta": {"total": total, "page": page, "per_page": per_page},
-        "data": results
+        "meta": meta,
+        "data": ATTENDANCE_LOG_ROW.many(items)
     }), 200
 
 # ---------------- Employee Management ---------------- #
+EMPLOYEES_DIRECTORY = DirectoryView(
+    default_fields=("id", "name", "email", "department", "status", "role"),
+    order_by=[("name", False), ("id", False)],
+    where=[User.role == "employee"],
+    converters={"status": str.capitalize},  # Always 'Active' or 'Inactive'
+    order_plain_list=False,
+)
+
 @admin_bp.route("/employees", methods=["GET"])
 @roles_required("admin", "hr")
 def get_employees():
-    employees = User.query.filter(User.role == "employee").all()
-    return jsonify([{
-        "id": str(emp.id),
-        "name": emp.name,
-        "email": emp.email,
-        "department": emp.department,
-        "status": emp.status.capitalize(),  # Always 'Active' or 'Inactive'
-        "role": emp.role
-    } for emp in employees]), 200
+    """Fields, filters, cursor pagination and NDJSON: see services/directory.py."""
+    return EMPLOYEES_DIRECTORY.respond(request.args)
 
 @admin_bp.route("/employees", methods=["POST"])
 @roles_required("admin")
@@ -139,6 +176,47 @@ def create_employee():
 
     return jsonify({"message": "Employee created", "id": str(new_user.id)}), 201
 
+@admin_bp.route("/employees/import", methods=["POST"])
+@roles_required("admin")
+def import_employees():
+    """
+    POST /api/admin/employees/import
+    Body: JSON list (or {"employees": [...]}) of {name, email, password?, role?,
+    department?, status?}, a text/csv body, or a multipart "file" upload
+    with those columns. Returns a per-row report.
+
+    Everything runs inside the request, so an import is capped at
+    IMPORT_MAX_ROWS rows and IMPORT_MAX_PASSWORDS explicit passwords (each
+    one is a bcrypt hash); larger files go through `flask import-employees`.
+    """
+    upload = request.files.get("file")
+    try:
+        if upload is not None:
+            rows = employee_import.parse_csv(upload.read())
+        elif request.mimetype == "text/csv":
+            rows = employee_import.parse_csv(request.get_data())
+        else:
+            data = request.get_json(silent=True)
+            rows = data.get("employees") if isinstance(data, dict) else data
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    if not isinstance(rows, list) or not rows:
+        return jsonify({"error": "Provide a non-empty list of employees (JSON or CSV)"}), 400
+
+    max_rows = current_app.config.get("IMPORT_MAX_ROWS", 5000)
+    if len(rows) > max_rows:
+        return jsonify({"error": f"At most {max_rows} rows per import; use `flask import-employees` for more"}), 400
+    max_passwords = current_app.config.get("IMPORT_MAX_PASSWORDS", 50)
+    if sum(1 for r in rows if isinstance(r, dict) and r.get("password")) > max_passwords:
+        return jsonify({
+            "error": f"At most {max_passwords} explicit passwords per import; "
+                     "omit them to use the default password or use `flask import-employees`"
+        }), 400
+
+    report = employee_import.import_employees(rows)
+    created = sum(1 for r in report if r["status"] == "created")
+    return jsonify({"created": created, "failed": len(report) - created, "results": report}), 200
+
 @admin_bp.route("/employees/<uuid:user_id>", methods=["PUT"])
 @roles_required("admin")
 def update_employee(user_id):
@@ -171,3 +249,23 @@ def delete_employee(user_id):
     db.session.delete(user)
     db.session.commit()
     return jsonify({"message": "Employee deleted"}), 200
+
+# ---------------- Diagnostics ---------------- #
+@admin_bp.route("/cache-stats", methods=["GET"])
+@roles_required("admin")
+def cache_stats():
+    return jsonify({
+        "principalCache": principal_cache.stats(),
+        "descriptorCache": descriptor_cache.stats(),
+        "groupCommit": group_committer.stats(),
+        "passwordHasher": password_hasher.stats(),
+        "responseCache": response_cache.stats(),
+    }), 200
+
+@admin_bp.route("/db-stats", methods=["GET"])
+@roles_required("admin")
+def db_stats():
+    stats = {"pool": pool_stats(), "queries": query_instrumentation.stats()}
+    if READ_REPLICA in db.engines:
+        stats["replicaPool"] = pool_stats(db.engines[READ_REPLICA])
+    return jsonify(stats), 200
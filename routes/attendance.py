@@ -1,8 +1,15 @@
-from flask import Blueprint, request, jsonify
-from datetime import datetime, date
-from sqlalchemy.exc import IntegrityError
+import uuid
+from datetime import datetime, timedelta
+from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
 from database import db
-from models import AttendanceRecord, User
+from models import AttendanceRecord
+from routes.auth import kiosk_or_roles_required
+from services import clock_events
+from services.group_commit import group_committer, GroupCommitTimeout
+from services.metrics import metrics
+from services.serializers import RowSerializer, iso, str_or_none
 
 attendance_bp = Blueprint("attendance", __name__)
 
@@ -13,56 +20,124 @@ def handle_options():
         # Respond 200 for preflight
         return '', 200
 
+# HTTP responses for rejected punches
+_PUNCH_ERRORS = {
+    clock_events.USER_NOT_FOUND: ("User not found", 404),
+    clock_events.ALREADY_CLOCKED_IN: ("Already clocked in today", 400),
+    clock_events.NO_CLOCK_IN: ("No clock-in record found for today", 404),
+    clock_events.ALREADY_CLOCKED_OUT: ("Already clocked out", 400),
+}
+
+
+def _punch_user_id():
+    data = request.get_json(silent=True) or {}
+    try:
+        return uuid.UUID(str(data.get("user_id")))
+    except ValueError:
+        return None
+
+
+def _punch(typ, user_id):
+    """Apply one punch directly, or through the group-commit queue when enabled."""
+    if group_committer.enabled:
+        outcome = group_committer.submit(typ, user_id)
+    elif typ == clock_events.CLOCK_IN:
+        outcome = clock_events.clock_in(user_id)
+    else:
+        outcome = clock_events.clock_out(user_id)
+    metrics.clock_events([(typ, outcome)])
+    return outcome
+
+
+def _rejected(outcome):
+    message, status = _PUNCH_ERRORS[outcome["error"]]
+    return jsonify({"error": message}), status
+
 # ---------------- Clock-in ----------------
 @attendance_bp.route("/clock-in", methods=["POST", "OPTIONS"])
 def clock_in():
-    data = request.get_json()
-    user_id = data.get("user_id")
-
-    user = User.query.get(user_id)
-    if not user:
+    user_id = _punch_user_id()
+    if user_id is None:
         return jsonify({"error": "User not found"}), 404
 
-    record = AttendanceRecord(
-        user_id=user.id,
-        date=date.today(),
-        clock_in=datetime.utcnow(),
-    )
-
     try:
-        db.session.add(record)
-        db.session.commit()
-    except IntegrityError:
-        db.session.rollback()
-        return jsonify({"error": "Already clocked in today"}), 400
+        outcome = _punch(clock_events.CLOCK_IN, user_id)
+    except (GroupCommitTimeout, SQLAlchemyError):
+        return jsonify({"error": "Clock-in is busy, please retry"}), 503
+    if outcome["status"] == "rejected":
+        return _rejected(outcome)
 
-    return jsonify({"message": "Clock-in successful", "record_id": str(record.id)}), 201
+    return jsonify({"message": "Clock-in successful", "record_id": outcome["record_id"]}), 201
 
 # ---------------- Clock-out ----------------
 @attendance_bp.route("/clock-out", methods=["POST", "OPTIONS"])
 def clock_out():
-    data = request.get_json()
-    user_id = data.get("user_id")
-
-    record = AttendanceRecord.query.filter_by(
-        user_id=user_id, date=date.today()
-    ).first()
-
-    if not record:
+    user_id = _punch_user_id()
+    if user_id is None:
         return jsonify({"error": "No clock-in record found for today"}), 404
 
-    if record.clock_out:
-        return jsonify({"error": "Already clocked out"}), 400
-
-    record.clock_out = datetime.utcnow()
-    # Compute total hours
-    delta = record.clock_out - record.clock_in
-    record.total_hours = round(delta.total_seconds() / 3600, 2)
-
-    db.session.commit()
-    return jsonify({"message": "Clock-out successful", "total_hours": str(record.total_hours)})
+    try:
+        outcome = _punch(clock_events.CLOCK_OUT, user_id)
+    except (GroupCommitTimeout, SQLAlchemyError):
+        return jsonify({"error": "Clock-out is busy, please retry"}), 503
+    if outcome["status"] == "rejected":
+        return _rejected(outcome)
+
+    return jsonify({"message": "Clock-out successful", "total_hours": outcome["total_hours"]})
+
+# ---------------- Batch clock events (kiosks / offline sync) ----------------
+@attendance_bp.route("/batch", methods=["POST", "OPTIONS"])
+@kiosk_or_roles_required("admin", "hr")
+def clock_batch():
+    """
+    POST /api/attendance/batch
+    Body: {"events": [{"user_id", "type": "clock_in"|"clock_out", "timestamp": ISO 8601}, ...]}
+    Applies all events in one transaction and reports the outcome of each,
+    in request order.
+
+    Unlike the live punch routes this accepts caller-chosen times, so it
+    needs the KIOSK_TOKEN or an admin/hr JWT, and events dated more than
+    CLOCK_BATCH_MAX_SKEW_SECONDS ahead or CLOCK_BATCH_MAX_AGE_HOURS behind
+    the server clock are rejected as invalid_event.
+    """
+    data = request.get_json(silent=True)
+    raw_events = data.get("events") if isinstance(data, dict) else data
+    if not isinstance(raw_events, list) or not raw_events:
+        return jsonify({"error": "events must be a non-empty list"}), 400
+    max_events = current_app.config.get("CLOCK_BATCH_MAX_EVENTS", 1000)
+    if len(raw_events) > max_events:
+        return jsonify({"error": f"At most {max_events} events per batch"}), 400
+
+    now = datetime.utcnow()
+    not_before = now - timedelta(hours=float(current_app.config.get("CLOCK_BATCH_MAX_AGE_HOURS", 72)))
+    not_after = now + timedelta(seconds=float(current_app.config.get("CLOCK_BATCH_MAX_SKEW_SECONDS", 300)))
+
+    events, messages = [], {}
+    for i, raw in enumerate(raw_events):
+        try:
+            events.append(clock_events.parse_event(raw, not_before, not_after))
+        except ValueError as exc:
+            events.append(None)
+            messages[i] = str(exc)
+
+    outcomes = clock_events.apply_events(events)
+    metrics.clock_events((event and event["type"], outcome) for event, outcome in zip(events, outcomes))
+    results = []
+    for i, outcome in enumerate(outcomes):
+        item = {"index": i, **outcome}
+        if i in messages:
+            item["message"] = messages[i]
+        results.append(item)
+
+    return jsonify({
+        "accepted": sum(1 for r in results if r["status"] != "rejected"),
+        "rejected": sum(1 for r in results if r["status"] == "rejected"),
+        "results": results,
+    }), 200
 
 # ---------------- Attendance history (example GET) ----------------
+HISTORY_ROW = RowSerializer(("date", iso), ("clock_in", iso), ("clock_out", iso), ("total_hours", str_or_none))
+
 @attendance_bp.route("/history", methods=["GET", "OPTIONS"])
 def attendance_history():
     if request.method == "OPTIONS":
@@ -72,14 +147,9 @@ def attendance_history():
     if not user_id:
         return jsonify({"error": "user_id required"}), 400
 
-    records = AttendanceRecord.query.filter_by(user_id=user_id).order_by(AttendanceRecord.date.desc()).all()
-    data = [
-        {
-            "date": r.date.isoformat(),
-            "clock_in": r.clock_in.isoformat(),
-            "clock_out": r.clock_out.isoformat() if r.clock_out else None,
-            "total_hours": str(r.total_hours) if r.total_hours else None
-        }
-        for r in records
-    ]
-    return jsonify(data), 200
+    records = db.session.execute(
+        select(AttendanceRecord.date, AttendanceRecord.clock_in, AttendanceRecord.clock_out, AttendanceRecord.total_hours)
+        .where(AttendanceRecord.user_id == user_id)
+        .order_by(AttendanceRecord.date.desc())
+    )
+    return jsonify(HISTORY_ROW.many(records)), 200
@@ -1,3 +1,5 @@
+import hmac
+import os
 from functools import wraps
 from datetime import datetime, timedelta
 import jwt
@@ -6,6 +8,9 @@ from flask import Blueprint, request, jsonify, current_app, g
 
 from database import db
 from models import User
+from services.principal_cache import principal_cache
+from services.passwords import PasswordHasherBusy
+from services.directory import DirectoryView, USER_FIELDS
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -56,7 +61,7 @@ def jwt_required(f):
             return jsonify({"error": "Token expired" if payload["error"] == "token_expired" else "Invalid token"}), 401
 
         user_id = payload.get("sub")
-        user = User.query.filter_by(id=user_id).first()
+        user = principal_cache.get_user(user_id)
         if not user:
             return jsonify({"error": "User not found"}), 401
         if user.status != "Active":
@@ -81,6 +86,26 @@ def roles_required(*allowed_roles):
         return decorated
     return decorator
 
+def kiosk_or_roles_required(*allowed_roles):
+    """
+    Accept either the shared kiosk credential (KIOSK_TOKEN, sent as
+    "Bearer <token>") or a JWT of one of `allowed_roles`. Without a
+    configured KIOSK_TOKEN only the JWT is accepted.
+    """
+    def decorator(f):
+        by_role = roles_required(*allowed_roles)(f)
+
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            kiosk_token = current_app.config.get("KIOSK_TOKEN", os.environ.get("KIOSK_TOKEN")) or None
+            if kiosk_token and hmac.compare_digest(
+                request.headers.get("Authorization", "").encode("utf-8"), f"Bearer {kiosk_token}".encode("utf-8")
+            ):
+                return f(*args, **kwargs)
+            return by_role(*args, **kwargs)
+        return decorated
+    return decorator
+
 # ---------------- Utilities ---------------- #
 def user_summary(user: User) -> dict:
     return {
@@ -94,6 +119,12 @@ def user_summary(user: User) -> dict:
         "updated_at": user.updated_at.isoformat() if getattr(user, "updated_at", None) else None,
     }
 
+# Same shape as user_summary
+USERS_DIRECTORY = DirectoryView(
+    default_fields=tuple(USER_FIELDS),
+    order_by=[("created_at", True), ("id", True)],
+)
+
 @auth_bp.route("/admin/create", methods=["POST"])
 def create_admin():
     """
@@ -157,11 +188,24 @@ def login():
         return jsonify({"error": "Email and password required"}), 400
 
     user = User.query.filter_by(email=email).first()
-    if not user or not user.check_password(password):
+    try:
+        valid = bool(user) and user.check_password(password)
+    except PasswordHasherBusy:
+        resp = jsonify({"error": "Too many login attempts, please retry shortly"})
+        resp.headers["Retry-After"] = "1"
+        return resp, 429
+    if not valid:
         return jsonify({"error": "Invalid credentials"}), 401
     if user.status != "Active":
         return jsonify({"error": "Account inactive"}), 403
 
+    # Move the stored hash to the configured work factor while we have the plaintext
+    try:
+        if user.rehash_password_if_needed(password):
+            db.session.commit()
+    except PasswordHasherBusy:
+        pass  # not worth failing the login over; retried on a later login
+
     token = create_jwt_token(str(user.id), user.role)
     return jsonify({"token": token, "user": user_summary(user)}), 200
 
@@ -180,6 +224,7 @@ def change_password():
     if len(new) < 6:
         return jsonify({"error": "New password must be at least 6 characters"}), 400
 
+    # set_password always hashes at the target cost (BCRYPT_LOG_ROUNDS)
     user.set_password(new)
     db.session.commit()
     return jsonify({"message": "Password updated successfully"}), 200
@@ -216,6 +261,6 @@ def create_employee():
 @auth_bp.route("/users", methods=["GET"])
 @roles_required("admin", "hr")
 def list_users():
-    users = User.query.order_by(User.created_at.desc()).all()
-    return jsonify([user_summary(u) for u in users]), 200
+    """Fields, filters, cursor pagination and NDJSON: see services/directory.py."""
+    return USERS_DIRECTORY.respond(request.args)
 
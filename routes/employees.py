@@ -1,12 +1,21 @@
 # routes/employees.py
-from flask import Blueprint, jsonify
+from flask import Blueprint, request
 from models import User
-from routes.auth import roles_required, user_summary
+from routes.auth import roles_required
+from services.directory import DirectoryView, USER_FIELDS
 
 employees_bp = Blueprint("employees", __name__)
 
+# Same shape as user_summary
+EMPLOYEES_SUMMARY_DIRECTORY = DirectoryView(
+    default_fields=tuple(USER_FIELDS),
+    order_by=[("name", False), ("id", False)],
+    where=[User.role == "employee"],
+    order_plain_list=False,
+)
+
 @employees_bp.route("/admin/employees", methods=["GET"])
 @roles_required("admin", "hr")
 def list_employees():
-    employees = User.query.filter_by(role="employee").all()
-    return jsonify([user_summary(u) for u in employees]), 200
+    """Fields, filters, cursor pagination and NDJSON: see services/directory.py."""
+    return EMPLOYEES_SUMMARY_DIRECTORY.respond(request.args)
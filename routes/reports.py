@@ -1,56 +1,73 @@
 # routes/reports.py
-from flask import Blueprint, request, jsonify, Response
+from flask import Blueprint, request, jsonify, Response, current_app, stream_with_context
 from datetime import date, timedelta, datetime
-import io, csv
-from sqlalchemy import func
-from database import db
+import io, csv, zlib
+from sqlalchemy import select
+from database import db, route_to_read_replica
 from models import User, AttendanceRecord
 from routes.auth import roles_required
+from services.attendance_stats import parse_date_range, daily_series
+from services.response_cache import cached_response
 
 reports_bp = Blueprint("reports", __name__)
 
+# Every report is read-only: serve them from the read replica when configured
+reports_bp.before_request(route_to_read_replica)
+
+# Rows fetched from the cursor and written per CSV chunk
+EXPORT_CHUNK_ROWS = 1000
+
 
 @reports_bp.route("/absenteeism-trends", methods=["GET"])
 @roles_required("admin", "hr")
+@cached_response
 def absenteeism_trends():
     """
-    GET /api/reports/absenteeism-trends
-    Returns present vs absent counts for the past 7 days (including today).
+    GET /api/reports/absenteeism-trends?from=YYYY-MM-DD&to=YYYY-MM-DD&groupBy=department
+    Returns present vs absent (and late) counts per day.
+    Defaults to the past 7 days (including today).
     """
-    total_active = db.session.query(func.count(User.id)).filter(User.status == "Active").scalar() or 0
+    try:
+        start, end = parse_date_range(request.args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    by_department = request.args.get("groupBy") == "department"
+
     results = []
-    for days_ago in range(6, -1, -1):  # 6 days ago ... today
-        day = date.today() - timedelta(days=days_ago)
-        present = (
-            db.session.query(func.count(func.distinct(AttendanceRecord.user_id)))
-            .filter(AttendanceRecord.date == day)
-            .scalar() or 0
-        )
-        results.append({
+    for day, department, stats, headcount in daily_series(start, end, by_department):
+        item = {
             "name": day.strftime("%a"),  # Mon, Tue, ...
-            "Present": int(present),
-            "Absent": int(max(total_active - present, 0))
-        })
+            "date": day.isoformat(),
+            "Present": stats["present"],
+            "Absent": max(headcount - stats["present"], 0),
+            "Late": stats["late"],
+        }
+        if by_department:
+            item["department"] = department
+        results.append(item)
     return jsonify(results), 200
 
 
 @reports_bp.route("/working-hours", methods=["GET"])
 @roles_required("admin", "hr")
+@cached_response
 def working_hours():
     """
-    GET /api/reports/working-hours
-    Average total_hours per day for the last 7 days.
+    GET /api/reports/working-hours?from=YYYY-MM-DD&to=YYYY-MM-DD&groupBy=department
+    Average total_hours per day. Defaults to the last 7 days.
     """
+    try:
+        start, end = parse_date_range(request.args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    by_department = request.args.get("groupBy") == "department"
+
     results = []
-    for days_ago in range(6, -1, -1):
-        day = date.today() - timedelta(days=days_ago)
-        avg = (
-            db.session.query(func.avg(AttendanceRecord.total_hours))
-            .filter(AttendanceRecord.date == day, AttendanceRecord.total_hours.isnot(None))
-            .scalar()
-        )
-        avg_val = float(round(avg, 2)) if avg is not None else None
-        results.append({"name": day.strftime("%a"), "avgHours": avg_val})
+    for day, department, stats, _ in daily_series(start, end, by_department):
+        item = {"name": day.strftime("%a"), "date": day.isoformat(), "avgHours": stats["avg_hours"]}
+        if by_department:
+            item["department"] = department
+        results.append(item)
     return jsonify(results), 200
 
 
@@ -59,20 +76,29 @@ def working_hours():
 def download():
     """
     GET /api/reports/download?type=weekly|monthly
-    Returns CSV file as attachment.
+    GET /api/reports/download?from=YYYY-MM-DD&to=YYYY-MM-DD&department=Ops&gzip=1
+    Streams a CSV file as attachment (gzip-compressed when gzip=1).
+    Rows are read and written in chunks, so memory stays flat for any range.
     """
-    typ = request.args.get("type", "weekly").lower()
-    if typ not in ("weekly", "monthly"):
-        return jsonify({"error": "type must be 'weekly' or 'monthly'"}), 400
-
-    if typ == "weekly":
-        start = date.today() - timedelta(days=6)
+    if request.args.get("from") or request.args.get("to"):
+        try:
+            start, end = parse_date_range(request.args)
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        prefix = "attendance"
     else:
-        start = date.today() - timedelta(days=29)
-    end = date.today()
+        typ = request.args.get("type", "weekly").lower()
+        if typ not in ("weekly", "monthly"):
+            return jsonify({"error": "type must be 'weekly' or 'monthly'"}), 400
+        end = date.today()
+        start = end - timedelta(days=6 if typ == "weekly" else 29)
+        prefix = f"{typ}_attendance"
 
-    rows = (
-        db.session.query(
+    department = (request.args.get("department") or "").strip()
+    compress = request.args.get("gzip", "").lower() in ("1", "true", "yes")
+
+    stmt = (
+        select(
             AttendanceRecord.date,
             AttendanceRecord.user_id,
             User.name,
@@ -81,28 +107,56 @@ def download():
             AttendanceRecord.total_hours
         )
         .join(User, AttendanceRecord.user_id == User.id)
-        .filter(AttendanceRecord.date >= start, AttendanceRecord.date <= end)
+        .where(AttendanceRecord.date >= start, AttendanceRecord.date <= end)
         .order_by(AttendanceRecord.date.asc(), User.name.asc())
-        .all()
     )
+    if department:
+        stmt = stmt.where(User.department == department)
+
+    chunks = _csv_chunks(stmt)
+    filename = f"{prefix}_{start.isoformat()}_to_{end.isoformat()}.csv"
+    mimetype = "text/csv"
+    if compress:
+        chunks = _gzip_chunks(chunks)
+        filename += ".gz"
+        mimetype = "application/gzip"
 
-    # Build CSV
+    resp = Response(stream_with_context(chunks), mimetype=mimetype)
+    resp.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return resp
+
+
+def _csv_chunks(stmt):
+    """Yield the CSV export one encoded chunk per EXPORT_CHUNK_ROWS rows."""
+    chunk_rows = current_app.config.get("EXPORT_CHUNK_ROWS", EXPORT_CHUNK_ROWS)
     si = io.StringIO()
     cw = csv.writer(si)
     cw.writerow(["date", "user_id", "user_name", "clock_in", "clock_out", "total_hours"])
-    for r in rows:
-        cw.writerow([
+
+    # yield_per streams from a server-side cursor where the driver supports it
+    result = db.session.execute(stmt.execution_options(yield_per=chunk_rows))
+    for partition in result.partitions():
+        cw.writerows([
             r.date.isoformat() if r.date else "",
             str(r.user_id),
             r.name,
             r.clock_in.isoformat() if r.clock_in else "",
             r.clock_out.isoformat() if r.clock_out else "",
             float(r.total_hours) if r.total_hours is not None else ""
-        ])
-    csv_content = si.getvalue()
-    si.close()
+        ] for r in partition)
+        yield si.getvalue().encode("utf-8")
+        si.seek(0)
+        si.truncate()
 
-    filename = f"{typ}_attendance_{start.isoformat()}_to_{end.isoformat()}.csv"
-    resp = Response(csv_content, mimetype="text/csv")
-    resp.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
-    return resp
+    tail = si.getvalue()
+    if tail:
+        yield tail.encode("utf-8")
+
+
+def _gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -1,25 +1,51 @@
 # routes/webauthn.py
+import json
 from flask import Blueprint, request, jsonify, session, current_app, g
 from routes.auth import jwt_required
 from services.webauthn_service import WebAuthnService
+from services.challenge_store import challenge_store
 from models import WebAuthnCredential
 
 webauthn_bp = Blueprint("webauthn", __name__)
 
-# Key to store challenge in session
-CHALLENGE_SESSION_KEY = "webauthn_challenge"
+# Session fallback for clients that do not echo the ceremony id back
+CEREMONY_SESSION_KEY = "webauthn_ceremony"
+CEREMONY_HEADER = "X-WebAuthn-Ceremony"
+
+
+def _begin(options_json: str, purpose: str, user_id):
+    """Store the options' challenge under a new ceremony id and build the response."""
+    options = json.loads(options_json)
+    ceremony_id = challenge_store().put(options["challenge"], purpose, user_id)
+    session[CEREMONY_SESSION_KEY] = ceremony_id
+    resp = jsonify({**options, "ceremonyId": ceremony_id})
+    resp.headers[CEREMONY_HEADER] = ceremony_id
+    return resp
+
+
+def _consume_challenge(purpose: str, user_id):
+    """Single-use lookup of the ceremony's challenge; None if missing, expired or mismatched."""
+    ceremony_id = (
+        request.args.get("ceremonyId")
+        or request.headers.get(CEREMONY_HEADER)
+        or session.get(CEREMONY_SESSION_KEY)
+    )
+    if not ceremony_id:
+        return None
+    if session.get(CEREMONY_SESSION_KEY) == ceremony_id:
+        session.pop(CEREMONY_SESSION_KEY, None)
+    record = challenge_store().consume(ceremony_id)
+    if not record or record["purpose"] != purpose or str(record["user_id"]) != str(user_id):
+        return None
+    return record["challenge"]
+
 
 @webauthn_bp.route("/register/begin", methods=["GET"])
 @jwt_required
 def register_begin():
     user = g.current_user
     options_json = WebAuthnService.start_registration(user)
-
-    # Store the challenge in session for verification
-    if isinstance(options_json, dict) and "challenge" in options_json:
-        session[CHALLENGE_SESSION_KEY] = options_json["challenge"]
-
-    return jsonify(options_json), 200
+    return _begin(options_json, "registration", user.id), 200
 
 
 @webauthn_bp.route("/register/finish", methods=["POST"])
@@ -28,10 +54,9 @@ def register_finish():
     user = g.current_user
     body = request.get_data(as_text=True)
 
-    # Get expected challenge from session
-    expected_challenge = session.get(CHALLENGE_SESSION_KEY)
+    expected_challenge = _consume_challenge("registration", user.id)
     if not expected_challenge:
-        return jsonify({"verified": False, "error": "Challenge not found in session"}), 400
+        return jsonify({"verified": False, "error": "Challenge not found or expired"}), 400
 
     try:
         cred = WebAuthnService.finish_registration(user, body, expected_challenge)
@@ -39,9 +64,6 @@ def register_finish():
         current_app.logger.exception("webauthn register failed")
         return jsonify({"verified": False, "error": str(exc)}), 400
 
-    # Clear challenge after use
-    session.pop(CHALLENGE_SESSION_KEY, None)
-
     return jsonify({
         "verified": True,
         "message": "Device registered successfully",
@@ -55,17 +77,12 @@ def login_begin():
     if not user_id:
         return jsonify({"error": "userId query param required"}), 400
 
-    from models import User
-    user = User.query.filter_by(id=user_id).first()
+    user = WebAuthnService.user_for_login(user_id)
     if not user:
         return jsonify({"error": "User not found"}), 404
 
     options_json = WebAuthnService.start_authentication(user)
-
-    if isinstance(options_json, dict) and "challenge" in options_json:
-        session[CHALLENGE_SESSION_KEY] = options_json["challenge"]
-
-    return jsonify(options_json), 200
+    return _begin(options_json, "authentication", user.id), 200
 
 
 @webauthn_bp.route("/login/finish", methods=["POST"])
@@ -74,16 +91,15 @@ def login_finish():
     if not user_id:
         return jsonify({"error": "userId query param required"}), 400
 
-    from models import User
-    user = User.query.filter_by(id=user_id).first()
+    user = WebAuthnService.load_user(user_id)
     if not user:
         return jsonify({"error": "User not found"}), 404
 
     body = request.get_data(as_text=True)
 
-    expected_challenge = session.get(CHALLENGE_SESSION_KEY)
+    expected_challenge = _consume_challenge("authentication", user.id)
     if not expected_challenge:
-        return jsonify({"verified": False, "error": "Challenge not found in session"}), 400
+        return jsonify({"verified": False, "error": "Challenge not found or expired"}), 400
 
     try:
         verification = WebAuthnService.finish_authentication(user, body, expected_challenge)
@@ -91,7 +107,6 @@ def login_finish():
         current_app.logger.exception("webauthn auth failed")
         return jsonify({"verified": False, "error": str(exc)}), 400
 
-    session.pop(CHALLENGE_SESSION_KEY, None)
     return jsonify({"verified": True, "message": "Verification successful"}), 200
 
 
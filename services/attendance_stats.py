@@ -0,0 +1,127 @@
+# services/attendance_stats.py
+from datetime import date, datetime, time as dt_time, timedelta
+from decimal import Decimal
+
+from flask import current_app
+from sqlalchemy import Time, cast, func
+
+from database import db
+from models import User, AttendanceRecord
+
+# Longest range a single report may cover
+MAX_RANGE_DAYS = 366
+
+
+# ---------- Request helpers ----------
+def parse_date_range(args, default_days: int = 7, max_days: int = MAX_RANGE_DAYS):
+    """
+    Read `from`/`to` (YYYY-MM-DD) from request args.
+    Defaults to the last `default_days` days ending today (inclusive).
+    Raises ValueError with a client-facing message on bad input.
+    """
+    try:
+        end = _parse_day(args.get("to")) or date.today()
+        start = _parse_day(args.get("from")) or end - timedelta(days=default_days - 1)
+    except ValueError:
+        raise ValueError("Invalid date format (use YYYY-MM-DD)")
+    if start > end:
+        raise ValueError("'from' must not be after 'to'")
+    if (end - start).days + 1 > max_days:
+        raise ValueError(f"Date range may not exceed {max_days} days")
+    return start, end
+
+
+def _parse_day(value):
+    if not value:
+        return None
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def iter_days(start: date, end: date):
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+# ---------- Late arrivals ----------
+def late_cutoff() -> dt_time:
+    """Clock-ins strictly after this time of day count as late (LATE_CUTOFF, default 09:00)."""
+    value = current_app.config.get("LATE_CUTOFF", "09:00")
+    if isinstance(value, dt_time):
+        return value
+    return datetime.strptime(value, "%H:%M").time()
+
+
+def is_late(clock_in: datetime) -> bool:
+    return clock_in.time() > late_cutoff()
+
+
+def late_expr(column=AttendanceRecord.clock_in):
+    """SQL boolean for `column`'s time of day being after the late cutoff."""
+    cutoff = late_cutoff()
+    if db.session.get_bind().dialect.name == "sqlite":
+        # SQLite stores DATETIME as text; compare fixed-width HH:MM:SS.SSS strings
+        return func.strftime("%H:%M:%f", column) > cutoff.strftime("%H:%M:%S.000")
+    return cast(column, Time) > cutoff
+
+
+# ---------- Aggregates ----------
+def active_headcount(by_department: bool = False):
+    """Active users, either as a single int or as {department: count}."""
+    if not by_department:
+        return db.session.query(func.count(User.id)).filter(User.status == "Active").scalar() or 0
+    rows = (
+        db.session.query(User.department, func.count(User.id))
+        .filter(User.status == "Active")
+        .group_by(User.department)
+        .all()
+    )
+    return {dept: count for dept, count in rows}
+
+
+def daily_stats(start: date, end: date, by_department: bool = False) -> dict:
+    """
+    Present count, late count and average hours per day, read from the
+    daily_attendance_summary rollup (one grouped query, O(days) rows).
+    Returns {(day, department_or_None): {"present", "late", "avg_hours"}};
+    days without records are simply absent from the mapping.
+    """
+    from services.attendance_summary import summary_rows
+
+    stats = {}
+    for day, department, present, late, completed, total_hours in summary_rows(start, end, by_department):
+        avg_hours = (Decimal(total_hours) / completed) if completed else None
+        stats[(_as_date(day), department)] = {
+            "present": int(present or 0),
+            "late": int(late or 0),
+            "avg_hours": float(round(avg_hours, 2)) if avg_hours is not None else None,
+        }
+    return stats
+
+
+def daily_series(start: date, end: date, by_department: bool = False):
+    """
+    Dense per-day (and optionally per-department) series, zero-filled in memory.
+    Yields (day, department_or_None, stats, headcount).
+    """
+    stats = daily_stats(start, end, by_department)
+    headcount = active_headcount(by_department)
+    empty = {"present": 0, "late": 0, "avg_hours": None}
+
+    if not by_department:
+        for day in iter_days(start, end):
+            yield day, None, stats.get((day, None), empty), headcount
+        return
+
+    departments = sorted(set(headcount) | {dept for _, dept in stats})
+    for day in iter_days(start, end):
+        for dept in departments:
+            yield day, dept, stats.get((day, dept), empty), headcount.get(dept, 0)
+
+
+def _as_date(value):
+    # Some drivers hand back DATE group keys as strings
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
@@ -0,0 +1,207 @@
+# services/attendance_summary.py
+from decimal import Decimal
+
+from sqlalchemy import case, delete, event, func, insert, inspect, literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from database import db
+from models import User, AttendanceRecord, DailyAttendanceSummary
+from services.attendance_stats import is_late, late_expr
+
+Summary = DailyAttendanceSummary
+_COUNTERS = ("present_count", "late_count", "completed_count", "total_hours")
+
+
+# ---------- Incremental maintenance ----------
+def bump(rows):
+    """
+    Add deltas to the rollup in the current transaction.
+    `rows` is a list of dicts with date, department and any of the counter
+    columns; missing counters default to 0. Rows are created on first use.
+    """
+    rows = [_with_defaults(r) for r in rows]
+    if not rows:
+        return
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        dialect_insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        stmt = dialect_insert(Summary)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Summary.date, Summary.department],
+            set_={name: getattr(Summary, name) + getattr(stmt.excluded, name) for name in _COUNTERS},
+        )
+        db.session.execute(stmt, rows)
+        return
+
+    # Portable fallback: UPDATE first, INSERT when the row does not exist yet
+    for row in rows:
+        result = db.session.execute(
+            update(Summary)
+            .where(Summary.date == row["date"], Summary.department == row["department"])
+            .values({name: getattr(Summary, name) + row[name] for name in _COUNTERS})
+        )
+        if result.rowcount == 0:
+            db.session.execute(insert(Summary).values(**row))
+
+
+def bump_for_user(user_id, day, **counters):
+    """
+    Same as bump() for one user's department, resolved inside the statement
+    (INSERT ... SELECT FROM users) so callers need not load the user first.
+    Only used on dialects with ON CONFLICT support.
+    """
+    row = _with_defaults({"date": day, "department": None, **counters})
+    dialect = db.session.get_bind().dialect.name
+    dialect_insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+    source = select(
+        literal(day, Summary.date.type),
+        User.department,
+        *(literal(row[name], getattr(Summary, name).type) for name in _COUNTERS),
+    ).where(User.id == user_id)
+    stmt = dialect_insert(Summary).from_select(["date", "department", *_COUNTERS], source)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Summary.date, Summary.department],
+        set_={name: getattr(Summary, name) + getattr(stmt.excluded, name) for name in _COUNTERS},
+    )
+    db.session.execute(stmt)
+
+
+def record_clock_in(record: AttendanceRecord, department: str):
+    bump([{
+        "date": record.date,
+        "department": department,
+        "present_count": 1,
+        "late_count": 1 if is_late(record.clock_in) else 0,
+    }])
+
+
+def record_clock_out(record: AttendanceRecord, department: str):
+    bump([{
+        "date": record.date,
+        "department": department,
+        "completed_count": 1,
+        "total_hours": Decimal(str(record.total_hours or 0)),
+    }])
+
+
+def _with_defaults(row: dict) -> dict:
+    return {
+        "date": row["date"],
+        "department": row["department"],
+        "present_count": row.get("present_count", 0),
+        "late_count": row.get("late_count", 0),
+        "completed_count": row.get("completed_count", 0),
+        "total_hours": row.get("total_hours", Decimal("0")),
+    }
+
+
+def _user_deltas(session, user_id, department: str, sign: int):
+    """Rollup deltas that add (sign=1) or remove (sign=-1) all of a user's records."""
+    records = session.execute(
+        select(AttendanceRecord.date, AttendanceRecord.clock_in, AttendanceRecord.clock_out, AttendanceRecord.total_hours)
+        .where(AttendanceRecord.user_id == user_id)
+    )
+    rows = []
+    for day, clock_in, clock_out, total_hours in records:
+        rows.append({
+            "date": day,
+            "department": department,
+            "present_count": sign,
+            "late_count": sign if is_late(clock_in) else 0,
+            "completed_count": sign if clock_out is not None else 0,
+            "total_hours": sign * Decimal(str(total_hours or 0)),
+        })
+    return rows
+
+
+# Deleting a user cascades to their attendance records, and reports group by
+# the user's current department; keep the rollup consistent with both.
+@event.listens_for(Session, "before_flush")
+def _track_user_changes(session, flush_context, instances):
+    rows = []
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            department = inspect(obj).attrs.department.history.deleted or [obj.department]
+            rows.extend(_user_deltas(session, obj.id, department[0], -1))
+    for obj in session.dirty:
+        if isinstance(obj, User) and obj not in session.deleted:
+            history = inspect(obj).attrs.department.history
+            if history.deleted and history.added and history.deleted[0] != history.added[0]:
+                rows.extend(_user_deltas(session, obj.id, history.deleted[0], -1))
+                rows.extend(_user_deltas(session, obj.id, history.added[0], 1))
+    if rows:
+        bump(rows)
+
+
+# ---------- Reads ----------
+def summary_rows(start, end, by_department: bool = False):
+    """
+    Rollup totals per day (and optionally department) for a date range:
+    yields (date, department_or_None, present, late, completed, total_hours).
+    """
+    columns = [
+        Summary.date,
+        func.sum(Summary.present_count),
+        func.sum(Summary.late_count),
+        func.sum(Summary.completed_count),
+        func.sum(Summary.total_hours),
+    ]
+    group_by = [Summary.date]
+    if by_department:
+        columns.insert(1, Summary.department)
+        group_by.append(Summary.department)
+    else:
+        columns.insert(1, literal(None))
+    return db.session.execute(
+        select(*columns)
+        .where(Summary.date >= start, Summary.date <= end)
+        .group_by(*group_by)
+    )
+
+
+# ---------- Rebuild ----------
+def rebuild(start=None, end=None) -> int:
+    """
+    Regenerate the rollup from attendance_records (optionally for a date
+    range only) in one DELETE + INSERT ... SELECT. Returns rows written.
+    """
+    clear = delete(Summary)
+    source = (
+        select(
+            AttendanceRecord.date,
+            User.department,
+            func.count(AttendanceRecord.id),
+            func.sum(case((late_expr(), 1), else_=0)),
+            func.count(AttendanceRecord.clock_out),
+            func.coalesce(func.sum(AttendanceRecord.total_hours), 0),
+        )
+        .join(User, AttendanceRecord.user_id == User.id)
+        .group_by(AttendanceRecord.date, User.department)
+    )
+    if start is not None:
+        clear = clear.where(Summary.date >= start)
+        source = source.where(AttendanceRecord.date >= start)
+    if end is not None:
+        clear = clear.where(Summary.date <= end)
+        source = source.where(AttendanceRecord.date <= end)
+
+    db.session.execute(clear)
+    result = db.session.execute(
+        insert(Summary).from_select(["date", "department", *_COUNTERS], source)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def ensure_populated(app) -> int:
+    """Build the rollup once for databases that predate it; returns rows written."""
+    with app.app_context():
+        has_summary = db.session.query(Summary.date).first() is not None
+        has_records = db.session.query(AttendanceRecord.id).first() is not None
+        if has_records and not has_summary:
+            rows = rebuild()
+            app.logger.info("Built daily_attendance_summary from attendance_records (%s rows)", rows)
+            return rows
+    return 0
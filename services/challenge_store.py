@@ -0,0 +1,156 @@
+# services/challenge_store.py
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, select
+
+from database import db
+from models import WebAuthnChallenge
+
+
+def new_ceremony_id() -> str:
+    return secrets.token_urlsafe(24)
+
+
+# ---------- In-memory backend ----------
+class MemoryChallengeStore:
+    """
+    Per-process LRU of pending challenges. Only suitable for a single worker
+    (or sticky sessions); use DatabaseChallengeStore across workers/nodes.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, challenge: str, purpose: str, user_id=None) -> str:
+        ceremony_id = new_ceremony_id()
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            self._entries[ceremony_id] = (now + self.ttl_seconds, {
+                "challenge": challenge, "purpose": purpose, "user_id": user_id,
+            })
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return ceremony_id
+
+    def consume(self, ceremony_id: str):
+        """Remove and return the challenge record, or None if unknown or expired."""
+        with self._lock:
+            entry = self._entries.pop(ceremony_id, None)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def _purge(self, now):
+        # Entries share one TTL, so insertion order is expiry order
+        while self._entries:
+            expires_at, _ = next(iter(self._entries.values()))
+            if expires_at >= now:
+                break
+            self._entries.popitem(last=False)
+
+
+# ---------- Database backend ----------
+class DatabaseChallengeStore:
+    """
+    Challenges in the webauthn_challenges table, shared by every worker and
+    node using the database. Writes use their own short transaction on the
+    primary engine so they never mix with the request's session.
+    A daemon thread deletes expired rows every purge_interval seconds.
+    """
+
+    def __init__(self, app, ttl_seconds: float, purge_interval: float = 60.0):
+        self.app = app
+        self.ttl_seconds = ttl_seconds
+        self.purge_interval = purge_interval
+        self._purger = None
+        self._pid = None
+
+    def put(self, challenge: str, purpose: str, user_id=None) -> str:
+        self._ensure_purger()
+        ceremony_id = new_ceremony_id()
+        table = WebAuthnChallenge.__table__
+        with db.engine.begin() as conn:
+            conn.execute(table.insert().values(
+                id=ceremony_id,
+                challenge=challenge,
+                user_id=user_id,
+                purpose=purpose,
+                expires_at=datetime.utcnow() + timedelta(seconds=self.ttl_seconds),
+            ))
+        return ceremony_id
+
+    def consume(self, ceremony_id: str):
+        table = WebAuthnChallenge.__table__
+        now = datetime.utcnow()
+        with db.engine.begin() as conn:
+            if conn.dialect.name in ("sqlite", "postgresql"):
+                # DELETE ... RETURNING: the row can be claimed exactly once
+                row = conn.execute(
+                    delete(table)
+                    .where(table.c.id == ceremony_id)
+                    .returning(table.c.challenge, table.c.purpose, table.c.user_id, table.c.expires_at)
+                ).first()
+            else:
+                row = conn.execute(
+                    select(table.c.challenge, table.c.purpose, table.c.user_id, table.c.expires_at)
+                    .where(table.c.id == ceremony_id)
+                    .with_for_update()
+                ).first()
+                if row is not None and conn.execute(delete(table).where(table.c.id == ceremony_id)).rowcount != 1:
+                    row = None
+        if row is None or row.expires_at < now:
+            return None
+        return {"challenge": row.challenge, "purpose": row.purpose, "user_id": row.user_id}
+
+    def purge_expired(self) -> int:
+        table = WebAuthnChallenge.__table__
+        with db.engine.begin() as conn:
+            return conn.execute(delete(table).where(table.c.expires_at < datetime.utcnow())).rowcount
+
+    def _ensure_purger(self):
+        if self._purger is not None and self._purger.is_alive() and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._purger = threading.Thread(target=self._purge_loop, name="webauthn-challenge-purge", daemon=True)
+        self._purger.start()
+
+    def _purge_loop(self):
+        while True:
+            time.sleep(self.purge_interval)
+            try:
+                with self.app.app_context():
+                    self.purge_expired()
+            except Exception:
+                self.app.logger.exception("webauthn challenge purge failed")
+
+
+def init_challenge_store(app):
+    """Build the store selected by WEBAUTHN_CHALLENGE_STORE (database | memory)."""
+    def setting(name, default):
+        return app.config.get(name, os.environ.get(name, default))
+
+    backend = setting("WEBAUTHN_CHALLENGE_STORE", "database")
+    ttl = float(setting("WEBAUTHN_CHALLENGE_TTL", 300))
+    if backend == "memory":
+        store = MemoryChallengeStore(ttl, int(setting("WEBAUTHN_CHALLENGE_MAX", 10000)))
+    elif backend == "database":
+        store = DatabaseChallengeStore(app, ttl, float(setting("WEBAUTHN_CHALLENGE_PURGE_INTERVAL", 60)))
+    else:
+        raise ValueError(f"Unknown WEBAUTHN_CHALLENGE_STORE {backend!r} (use 'database' or 'memory')")
+    app.extensions["webauthn_challenges"] = store
+    return store
+
+
+def challenge_store():
+    """The current app's challenge store."""
+    return current_app.extensions["webauthn_challenges"]
@@ -0,0 +1,312 @@
+# services/clock_events.py
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import DateTime, Numeric, cast, func, insert, literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+from database import db
+from models import AttendanceRecord, User
+from services import attendance_summary
+from services.attendance_stats import is_late
+
+CLOCK_IN = "clock_in"
+CLOCK_OUT = "clock_out"
+
+# Error codes reported per event
+USER_NOT_FOUND = "user_not_found"
+ALREADY_CLOCKED_IN = "already_clocked_in"
+NO_CLOCK_IN = "no_clock_in"
+ALREADY_CLOCKED_OUT = "already_clocked_out"
+INVALID_EVENT = "invalid_event"
+
+
+def attendance_day(ts: datetime) -> date:
+    """
+    Attendance date of a naive UTC timestamp: the server's local calendar day,
+    the same basis the dashboard and reports use for "today". Live punches,
+    group commits and batch replays all key records on this.
+    """
+    return ts.replace(tzinfo=timezone.utc).astimezone().date()
+
+
+def hours_text(hours) -> str:
+    """
+    total_hours as clock-out responses have always shown it: two decimal
+    places ("8.50"), as the Numeric(4, 2) column reads back, whatever type
+    the driver or a RETURNING clause hands us.
+    """
+    return f"{Decimal(str(hours)):.2f}"
+
+
+def parse_event(raw, not_before: datetime = None, not_after: datetime = None) -> dict:
+    """
+    Normalise one client event: {"user_id", "type": clock_in|clock_out, "timestamp"?}.
+    Timestamps are ISO 8601; aware values are converted to naive UTC, missing
+    ones default to now. The event's date is attendance_day(timestamp).
+    Timestamps outside [not_before, not_after] (naive UTC) are refused.
+    Raises ValueError with a client-facing message.
+    """
+    if not isinstance(raw, dict):
+        raise ValueError("Event must be an object")
+    typ = str(raw.get("type") or "").replace("-", "_").lower()
+    if typ not in (CLOCK_IN, CLOCK_OUT):
+        raise ValueError("type must be 'clock_in' or 'clock_out'")
+    try:
+        user_id = uuid.UUID(str(raw.get("user_id")))
+    except ValueError:
+        raise ValueError("user_id must be a UUID")
+
+    timestamp = raw.get("timestamp")
+    if timestamp:
+        try:
+            ts = datetime.fromisoformat(str(timestamp).replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError("timestamp must be ISO 8601")
+        try:
+            if ts.tzinfo is not None:
+                ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+            day = attendance_day(ts)
+        except OverflowError:
+            raise ValueError("timestamp is out of range")
+    else:
+        ts = datetime.utcnow()
+        day = attendance_day(ts)
+    if not_after is not None and ts > not_after:
+        raise ValueError("timestamp is in the future")
+    if not_before is not None and ts < not_before:
+        raise ValueError("timestamp is older than the replay window")
+    return {"type": typ, "user_id": user_id, "timestamp": ts, "date": day}
+
+
+# ---------- Single punches ----------
+def _upsert_supported() -> bool:
+    return db.session.get_bind().dialect.name in ("sqlite", "postgresql")
+
+
+def _dialect_insert():
+    return sqlite.insert if db.session.get_bind().dialect.name == "sqlite" else postgresql.insert
+
+
+def _hours_since_clock_in(now: datetime):
+    """SQL expression for the hours between the row's clock_in and `now`, rounded to 2 places."""
+    now_value = literal(now, DateTime())
+    if db.session.get_bind().dialect.name == "sqlite":
+        elapsed = (func.julianday(now_value) - func.julianday(AttendanceRecord.clock_in)) * 24
+    else:
+        elapsed = func.extract("epoch", now_value - AttendanceRecord.clock_in) / 3600
+    return func.round(cast(elapsed, Numeric(12, 6)), 2)
+
+
+def clock_in(user_id, now: datetime = None) -> dict:
+    """
+    Clock a user in for today with a single INSERT ... SELECT ... ON CONFLICT
+    DO NOTHING RETURNING. A repeated punch inserts nothing and costs no
+    rollback; only then is a second query made to tell "already clocked in"
+    from "no such user". Commits on success.
+    """
+    now = now or datetime.utcnow()
+    day = attendance_day(now)
+    if not _upsert_supported():
+        return _clock_in_fallback(user_id, now, day)
+
+    record_id = uuid.uuid4()
+    source = select(
+        literal(record_id, AttendanceRecord.id.type),
+        User.id,
+        literal(day, AttendanceRecord.date.type),
+        literal(now, AttendanceRecord.clock_in.type),
+    ).where(User.id == user_id)
+    stmt = (
+        _dialect_insert()(AttendanceRecord)
+        .from_select(["id", "user_id", "date", "clock_in"], source)
+        .on_conflict_do_nothing(index_elements=["user_id", "date"])
+        .returning(AttendanceRecord.id)
+    )
+    inserted = db.session.execute(stmt).scalar()
+    if inserted is None:
+        exists = db.session.execute(select(User.id).where(User.id == user_id)).first()
+        return {"status": "rejected", "error": ALREADY_CLOCKED_IN if exists else USER_NOT_FOUND}
+
+    attendance_summary.bump_for_user(user_id, day, present_count=1, late_count=1 if is_late(now) else 0)
+    db.session.commit()
+    return {"status": "clocked_in", "record_id": str(inserted)}
+
+
+def clock_out(user_id, now: datetime = None) -> dict:
+    """
+    Clock a user out for today with a single
+    UPDATE ... WHERE clock_out IS NULL RETURNING; hours are computed in SQL.
+    Commits on success.
+    """
+    now = now or datetime.utcnow()
+    day = attendance_day(now)
+    if not _upsert_supported():
+        return _clock_out_fallback(user_id, now, day)
+
+    stmt = (
+        update(AttendanceRecord)
+        .where(
+            AttendanceRecord.user_id == user_id,
+            AttendanceRecord.date == day,
+            AttendanceRecord.clock_out.is_(None),
+        )
+        .values(clock_out=now, total_hours=_hours_since_clock_in(now))
+        .returning(AttendanceRecord.id, AttendanceRecord.total_hours)
+        .execution_options(synchronize_session=False)
+    )
+    updated = db.session.execute(stmt).first()
+    if updated is None:
+        existing = db.session.execute(
+            select(AttendanceRecord.id).where(AttendanceRecord.user_id == user_id, AttendanceRecord.date == day)
+        ).first()
+        return {"status": "rejected", "error": ALREADY_CLOCKED_OUT if existing else NO_CLOCK_IN}
+
+    record_id, total_hours = updated
+    attendance_summary.bump_for_user(
+        user_id, day, completed_count=1, total_hours=Decimal(str(total_hours or 0))
+    )
+    db.session.commit()
+    return {"status": "clocked_out", "record_id": str(record_id), "total_hours": hours_text(total_hours)}
+
+
+def _clock_in_fallback(user_id, now, day):
+    user = db.session.get(User, user_id)
+    if not user:
+        return {"status": "rejected", "error": USER_NOT_FOUND}
+    record = AttendanceRecord(user_id=user.id, date=day, clock_in=now)
+    try:
+        db.session.add(record)
+        db.session.flush()
+        attendance_summary.record_clock_in(record, user.department)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return {"status": "rejected", "error": ALREADY_CLOCKED_IN}
+    return {"status": "clocked_in", "record_id": str(record.id)}
+
+
+def _clock_out_fallback(user_id, now, day):
+    record = AttendanceRecord.query.filter_by(user_id=user_id, date=day).first()
+    if not record:
+        return {"status": "rejected", "error": NO_CLOCK_IN}
+    if record.clock_out:
+        return {"status": "rejected", "error": ALREADY_CLOCKED_OUT}
+    record.clock_out = now
+    record.total_hours = round((record.clock_out - record.clock_in).total_seconds() / 3600, 2)
+    attendance_summary.record_clock_out(record, record.user.department)
+    db.session.commit()
+    return {"status": "clocked_out", "record_id": str(record.id), "total_hours": hours_text(record.total_hours)}
+
+
+# ---------- Batches ----------
+def apply_events(events: list) -> list:
+    """
+    Apply parsed clock events in one transaction and return one outcome per
+    event, in input order: {"status": "clocked_in"|"clocked_out", ...} or
+    {"status": "rejected", "error": <code>}.
+
+    Users are validated with one IN query, existing records are loaded with
+    one query, and all writes go out as bulk INSERT/UPDATE statements.
+    A concurrent punch for the same user and day is retried once.
+    """
+    for attempt in range(2):
+        try:
+            results = _apply(events)
+            db.session.commit()
+            return results
+        except IntegrityError:
+            db.session.rollback()
+            if attempt:
+                raise
+
+
+def _apply(events: list) -> list:
+    results = [None] * len(events)
+    valid = [(i, e) for i, e in enumerate(events) if e is not None]
+    for i, e in enumerate(events):
+        if e is None:
+            results[i] = {"status": "rejected", "error": INVALID_EVENT}
+    if not valid:
+        return results
+
+    user_ids = {e["user_id"] for _, e in valid}
+    departments = dict(db.session.execute(
+        select(User.id, User.department).where(User.id.in_(user_ids))
+    ).all())
+
+    days = {e["date"] for _, e in valid}
+    state = {}
+    for row in db.session.execute(
+        select(
+            AttendanceRecord.id,
+            AttendanceRecord.user_id,
+            AttendanceRecord.date,
+            AttendanceRecord.clock_in,
+            AttendanceRecord.clock_out,
+        ).where(AttendanceRecord.user_id.in_(list(departments)), AttendanceRecord.date.in_(days))
+    ):
+        state[(row.user_id, row.date)] = {
+            "id": row.id, "clock_in": row.clock_in, "clock_out": row.clock_out, "new": False,
+        }
+
+    inserts, updates = [], {}
+    rollup = defaultdict(lambda: defaultdict(int))
+
+    # Replay in punch order so an offline clock-in precedes its clock-out
+    for i, e in sorted(valid, key=lambda item: item[1]["timestamp"]):
+        if e["user_id"] not in departments:
+            results[i] = {"status": "rejected", "error": USER_NOT_FOUND}
+            continue
+        key = (e["user_id"], e["date"])
+        current = state.get(key)
+        rollup_key = (e["date"], departments[e["user_id"]])
+
+        if e["type"] == CLOCK_IN:
+            if current is not None:
+                results[i] = {"status": "rejected", "error": ALREADY_CLOCKED_IN}
+                continue
+            row = {
+                "id": uuid.uuid4(),
+                "user_id": e["user_id"],
+                "date": e["date"],
+                "clock_in": e["timestamp"],
+                "clock_out": None,
+                "total_hours": None,
+            }
+            inserts.append(row)
+            state[key] = {"id": row["id"], "clock_in": row["clock_in"], "clock_out": None, "new": row}
+            rollup[rollup_key]["present_count"] += 1
+            rollup[rollup_key]["late_count"] += 1 if is_late(e["timestamp"]) else 0
+            results[i] = {"status": "clocked_in", "record_id": str(row["id"])}
+            continue
+
+        if current is None:
+            results[i] = {"status": "rejected", "error": NO_CLOCK_IN}
+            continue
+        if current["clock_out"] is not None:
+            results[i] = {"status": "rejected", "error": ALREADY_CLOCKED_OUT}
+            continue
+        clock_out = max(e["timestamp"], current["clock_in"])
+        total_hours = round((clock_out - current["clock_in"]).total_seconds() / 3600, 2)
+        current["clock_out"] = clock_out
+        if current["new"]:
+            current["new"].update(clock_out=clock_out, total_hours=total_hours)
+        else:
+            updates[current["id"]] = {"id": current["id"], "clock_out": clock_out, "total_hours": total_hours}
+        rollup[rollup_key]["completed_count"] += 1
+        rollup[rollup_key]["total_hours"] += Decimal(str(total_hours))
+        results[i] = {"status": "clocked_out", "record_id": str(current["id"]), "total_hours": hours_text(total_hours)}
+
+    if inserts:
+        db.session.execute(insert(AttendanceRecord), inserts)
+    if updates:
+        db.session.execute(update(AttendanceRecord), list(updates.values()))
+    attendance_summary.bump([
+        {"date": day, "department": dept, **counters}
+        for (day, dept), counters in rollup.items()
+    ])
+    return results
@@ -0,0 +1,128 @@
+# services/credential_cache.py
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import User, WebAuthnCredential
+
+# Key in Session.info where ids of users whose credentials changed are collected
+_PENDING_KEY = "descriptor_cache_pending"
+
+
+class DescriptorCache:
+    """
+    In-process LRU + TTL cache of each user's WebAuthn credential descriptors
+    ((credential id, transports) tuples), used to build the allow/exclude
+    lists of ceremony options without touching webauthn_credentials.
+
+    Entries are dropped when a transaction that registers, updates (e.g. the
+    sign counter) or deletes one of the user's credentials commits. Like the
+    principal cache, invalidation only reaches the worker that made the
+    change; other workers catch up after the TTL.
+    """
+
+    def __init__(self, max_size: int = 4096, ttl_seconds: float = 60.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def init_app(self, app):
+        self.max_size = int(app.config.get(
+            "WEBAUTHN_DESCRIPTOR_CACHE_SIZE", os.environ.get("WEBAUTHN_DESCRIPTOR_CACHE_SIZE", 4096)
+        ))
+        self.ttl_seconds = float(app.config.get(
+            "WEBAUTHN_DESCRIPTOR_CACHE_TTL", os.environ.get("WEBAUTHN_DESCRIPTOR_CACHE_TTL", 60)
+        ))
+        self.clear()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    # ---------- Lookup ----------
+    def get(self, user_id):
+        """Cached descriptors for `user_id`, or None on a miss."""
+        if not self.enabled:
+            return None
+        key = str(user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user_id, credentials):
+        """Cache descriptors built from `credentials` (WebAuthnCredential rows) and return them."""
+        descriptors = tuple((cred.id, tuple(cred.transports or ())) for cred in credentials)
+        if self.enabled:
+            with self._lock:
+                self._entries[str(user_id)] = (time.monotonic() + self.ttl_seconds, descriptors)
+                self._entries.move_to_end(str(user_id))
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return descriptors
+
+    # ---------- Invalidation ----------
+    def invalidate(self, user_id):
+        with self._lock:
+            if self._entries.pop(str(user_id), None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "maxSize": self.max_size,
+                "ttlSeconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hitRatio": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+descriptor_cache = DescriptorCache()
+
+
+# ---------- Commit hooks ----------
+@event.listens_for(Session, "after_flush")
+def _collect_changed_credentials(session, flush_context):
+    changed = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, WebAuthnCredential):
+            changed.add(obj.user_id)
+        elif isinstance(obj, User) and obj in session.deleted:
+            changed.add(obj.id)
+    if changed:
+        session.info.setdefault(_PENDING_KEY, set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_credentials(session):
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        descriptor_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_changed_credentials(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
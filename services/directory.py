@@ -0,0 +1,189 @@
+# services/directory.py
+"""
+Shared implementation of the user directory endpoints (auth.list_users,
+admin.get_employees, employees.list_employees).
+
+Query parameters, all optional:
+    fields=id,name,email      only these keys (and only their columns are SELECTed)
+    department= status= role= exact-match filters
+    search=                   substring of name, email or department (services/user_search.py)
+    cursor=                   keyset pagination; empty for the first page, then
+                              meta.next_cursor from the previous page
+    per_page=50               page size in cursor mode (max 500)
+    withTotal=1               add meta.total in cursor mode
+    format=ndjson             stream every matching user, one JSON object per line
+
+Without cursor or format=ndjson the response is the plain JSON array the
+endpoints always returned.
+"""
+import uuid
+from datetime import datetime
+from functools import lru_cache
+
+from flask import Response, current_app, jsonify, stream_with_context
+from sqlalchemy import and_, func, or_, select
+
+from database import db
+from models import GUID, User
+from services.pagination import decode_cursor, encode_cursor
+from services.serializers import RowSerializer, iso, text
+from services.user_search import user_search_clause
+
+NDJSON_CHUNK_ROWS = 1000
+MAX_PER_PAGE = 500
+
+# Public field name -> (column, converter). password_hash is never selectable.
+USER_FIELDS = {
+    "id": (User.id, text),
+    "name": (User.name, None),
+    "email": (User.email, None),
+    "role": (User.role, None),
+    "department": (User.department, None),
+    "status": (User.status, None),
+    "created_at": (User.created_at, iso),
+    "updated_at": (User.updated_at, iso),
+}
+
+
+class DirectoryView:
+    """One directory endpoint: its default fields, fixed filters, ordering and converters."""
+
+    def __init__(self, default_fields, order_by, where=(), converters=None, order_plain_list=True):
+        """
+        order_by is a list of (field name, descending); the last entry must be
+        unique (id) so keyset positions are unambiguous. converters overrides
+        the USER_FIELDS converter per field (e.g. status capitalised).
+        order_plain_list=False keeps the unordered plain-array response of
+        endpoints that never sorted.
+        """
+        self.default_fields = tuple(default_fields)
+        self.order_by = tuple(order_by)
+        self.where = tuple(where)
+        self.converters = dict(converters or {})
+        self.order_plain_list = order_plain_list
+
+    # ---------- Request handling ----------
+    def respond(self, args):
+        try:
+            fields = self._fields(args.get("fields"))
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        try:
+            per_page = min(max(int(args.get("per_page", 50)), 1), MAX_PER_PAGE)
+        except ValueError:
+            return jsonify({"error": "per_page must be an integer"}), 400
+
+        filters = list(self.where)
+        for name, normalise in (("department", str), ("status", str.capitalize), ("role", str.lower)):
+            value = (args.get(name) or "").strip()
+            if value:
+                filters.append(USER_FIELDS[name][0] == normalise(value))
+        search = (args.get("search") or "").strip()
+        if search:
+            filters.append(user_search_clause(search))
+
+        if args.get("format", "").lower() == "ndjson":
+            return self._ndjson(fields, filters)
+        if args.get("cursor") is None:
+            stmt = select(*self._columns(fields)).where(*filters)
+            if self.order_plain_list:
+                stmt = stmt.order_by(*self._ordering())
+            rows = db.session.execute(stmt)
+            return jsonify(self._serializer(fields).many(rows)), 200
+        return self._page(fields, filters, args.get("cursor"), per_page, args)
+
+    def _fields(self, raw):
+        if not raw:
+            return self.default_fields
+        fields = tuple(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+        unknown = [f for f in fields if f not in USER_FIELDS]
+        if unknown or not fields:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown) or raw!r}; choose from {', '.join(USER_FIELDS)}")
+        return fields
+
+    # ---------- Modes ----------
+    def _page(self, fields, filters, cursor, per_page, args):
+        order_names = [name for name, _ in self.order_by]
+        stmt = select(*self._columns(fields), *[USER_FIELDS[n][0] for n in order_names]).where(*filters)
+        if cursor:
+            try:
+                position = [
+                    _cursor_value(USER_FIELDS[n][0], v)
+                    for n, v in zip(order_names, decode_cursor(cursor, len(order_names)))
+                ]
+            except (ValueError, TypeError, AttributeError):
+                return jsonify({"error": "Invalid cursor"}), 400
+            stmt = stmt.where(self._after(position))
+
+        rows = db.session.execute(stmt.order_by(*self._ordering()).limit(per_page + 1)).all()
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        meta = {"per_page": per_page, "next_cursor": None}
+        if has_more:
+            meta["next_cursor"] = encode_cursor(_cursor_json(v) for v in rows[-1][len(fields):])
+        if args.get("withTotal", "").lower() in ("1", "true"):
+            meta["total"] = db.session.execute(select(func.count()).select_from(User).where(*filters)).scalar()
+        return jsonify({"meta": meta, "data": self._serializer(fields, extra_columns=True).many(rows)}), 200
+
+    def _ndjson(self, fields, filters):
+        stmt = select(*self._columns(fields)).where(*filters).order_by(*self._ordering())
+        serialize = self._serializer(fields).row_function()
+        dumps = current_app.json.dumps
+        chunk_rows = current_app.config.get("NDJSON_CHUNK_ROWS", NDJSON_CHUNK_ROWS)
+
+        def lines():
+            # yield_per keeps one partition of rows in memory at a time
+            result = db.session.execute(stmt.execution_options(yield_per=chunk_rows))
+            for partition in result.partitions():
+                yield "".join(dumps(serialize(row)) + "\n" for row in partition).encode("utf-8")
+
+        return Response(stream_with_context(lines()), mimetype="application/x-ndjson")
+
+    # ---------- SQL helpers ----------
+    def _columns(self, fields):
+        return [USER_FIELDS[f][0] for f in fields]
+
+    def _ordering(self):
+        return [
+            USER_FIELDS[name][0].desc() if descending else USER_FIELDS[name][0].asc()
+            for name, descending in self.order_by
+        ]
+
+    def _after(self, position):
+        """Rows strictly after `position` in this view's ordering (keyset condition)."""
+        clauses = []
+        for i, ((name, descending), value) in enumerate(zip(self.order_by, position)):
+            column = USER_FIELDS[name][0]
+            equal = [USER_FIELDS[n][0] == v for (n, _), v in zip(self.order_by[:i], position[:i])]
+            clauses.append(and_(*equal, column < value if descending else column > value))
+        return or_(*clauses)
+
+    def _serializer(self, fields, extra_columns=False):
+        converters = tuple(self.converters.get(f, USER_FIELDS[f][1]) for f in fields)
+        return _compiled_serializer(fields, converters, extra_columns)
+
+
+@lru_cache(maxsize=128)
+def _compiled_serializer(fields, converters, extra_columns):
+    return RowSerializer(
+        *[f if c is None else (f, c) for f, c in zip(fields, converters)],
+        extra_columns=extra_columns,
+    )
+
+
+def _cursor_json(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _cursor_value(column, raw):
+    if isinstance(column.type, GUID):
+        return uuid.UUID(raw)
+    if column.type.python_type is datetime:
+        return datetime.fromisoformat(raw)
+    if not isinstance(raw, str):
+        raise ValueError("Invalid cursor")
+    return raw
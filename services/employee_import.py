@@ -0,0 +1,152 @@
+# services/employee_import.py
+import csv
+import io
+import os
+import uuid
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from database import db
+from models import User
+from services.passwords import hash_many, password_hasher
+
+DEFAULT_PASSWORD = "ChangeMe123!"
+VALID_ROLES = ("employee", "admin", "hr")
+VALID_STATUSES = ("Active", "Inactive")
+
+
+def parse_csv(data: bytes) -> list:
+    """
+    Rows from a UTF-8 CSV (optionally with a BOM) with a header line
+    (name,email[,password,role,department,status]). Raises ValueError on
+    any other encoding.
+    """
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValueError("CSV must be UTF-8 encoded")
+    reader = csv.DictReader(io.StringIO(text))
+    return [{(k or "").strip().lower(): v for k, v in row.items()} for row in reader]
+
+
+def _field(raw: dict, name: str, default: str = "") -> str:
+    """A text field of an untrusted row; missing or empty gives `default`."""
+    value = raw.get(name)
+    if value is None or value == "":
+        return default
+    if not isinstance(value, str):
+        raise ValueError(f"{name} must be a string")
+    return value
+
+
+def _normalise(raw) -> dict:
+    if not isinstance(raw, dict):
+        raise ValueError("Row must be an object")
+    row = {
+        "name": _field(raw, "name").strip(),
+        "email": _field(raw, "email").strip().lower(),
+        "password": _field(raw, "password") or None,
+        "role": _field(raw, "role", "employee").strip().lower(),
+        "department": _field(raw, "department", "General").strip(),
+        "status": _field(raw, "status", "Active").strip().capitalize(),
+    }
+    if not row["name"] or not row["email"]:
+        raise ValueError("Name and email are required")
+    if row["role"] not in VALID_ROLES:
+        raise ValueError("Invalid role")
+    if row["status"] not in VALID_STATUSES:
+        raise ValueError("Invalid status")
+    return row
+
+
+def _existing_emails(emails: list, chunk: int) -> set:
+    found = set()
+    for i in range(0, len(emails), chunk):
+        found.update(db.session.execute(
+            select(User.email).where(User.email.in_(emails[i:i + chunk]))
+        ).scalars())
+    return found
+
+
+def import_employees(raw_rows: list) -> list:
+    """
+    Validate, hash and bulk-insert employees. Returns one report entry per
+    input row: {"row", "email", "status": "created"|"error", "id"|"error"}.
+
+    Duplicate emails are found with set-based IN queries, explicit passwords
+    are hashed on a process pool, and users are inserted with executemany
+    INSERTs committed every IMPORT_BATCH_SIZE rows. Rows without a password
+    share one hash of the default password (it is the same, publicly known
+    value for all of them).
+    """
+    batch_size = int(current_app.config.get("IMPORT_BATCH_SIZE", 1000))
+    workers = int(current_app.config.get("IMPORT_HASH_WORKERS", os.cpu_count() or 2))
+    cost = int(current_app.config.get("IMPORT_BCRYPT_LOG_ROUNDS", password_hasher.target_cost))
+
+    report = [None] * len(raw_rows)
+    pending, seen = [], set()
+    for i, raw in enumerate(raw_rows):
+        try:
+            row = _normalise(raw)
+        except ValueError as exc:
+            email = raw.get("email") if isinstance(raw, dict) and isinstance(raw.get("email"), str) else None
+            report[i] = {"row": i, "email": email, "status": "error", "error": str(exc)}
+            continue
+        if row["email"] in seen:
+            report[i] = {"row": i, "email": row["email"], "status": "error", "error": "Duplicate email in import"}
+            continue
+        seen.add(row["email"])
+        pending.append((i, row))
+
+    existing = _existing_emails([row["email"] for _, row in pending], batch_size)
+    accepted = []
+    for i, row in pending:
+        if row["email"] in existing:
+            report[i] = {"row": i, "email": row["email"], "status": "error", "error": "User with that email already exists"}
+        else:
+            accepted.append((i, row))
+
+    explicit = [row["password"] for _, row in accepted if row["password"]]
+    hashes = iter(hash_many(explicit, cost, workers))
+    default_hash = hash_many([DEFAULT_PASSWORD], cost, 1)[0] if len(explicit) < len(accepted) else None
+
+    now = datetime.utcnow()
+    values = []
+    for i, row in accepted:
+        values.append((i, {
+            "id": uuid.uuid4(),
+            "name": row["name"],
+            "email": row["email"],
+            "password_hash": next(hashes) if row["password"] else default_hash,
+            "role": row["role"],
+            "department": row["department"],
+            "status": row["status"],
+            "created_at": now,
+            "updated_at": now,
+        }))
+
+    for start in range(0, len(values), batch_size):
+        _insert_batch(values[start:start + batch_size], report, batch_size)
+    return report
+
+
+def _insert_batch(batch: list, report: list, chunk: int):
+    try:
+        db.session.execute(insert(User), [v for _, v in batch])
+        db.session.commit()
+    except IntegrityError:
+        # An email was taken concurrently; drop the conflicting rows and retry once
+        db.session.rollback()
+        taken = _existing_emails([v["email"] for _, v in batch], chunk)
+        for i, v in batch:
+            if v["email"] in taken:
+                report[i] = {"row": i, "email": v["email"], "status": "error", "error": "User with that email already exists"}
+        batch = [(i, v) for i, v in batch if v["email"] not in taken]
+        if batch:
+            db.session.execute(insert(User), [v for _, v in batch])
+            db.session.commit()
+    for i, v in batch:
+        report[i] = {"row": i, "email": v["email"], "status": "created", "id": str(v["id"])}
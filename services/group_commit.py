@@ -0,0 +1,141 @@
+# services/group_commit.py
+import os
+import threading
+import time
+from datetime import datetime
+
+from database import db
+from services import clock_events
+
+
+class GroupCommitTimeout(Exception):
+    """The flush containing a submitted event did not finish in time."""
+
+
+class _Pending:
+    __slots__ = ("event", "done", "outcome", "error")
+
+    def __init__(self, event):
+        self.event = event
+        self.done = threading.Event()
+        self.outcome = None
+        self.error = None
+
+
+class GroupCommitter:
+    """
+    Optional group-commit write path for clock events.
+
+    Punches from all request threads of a worker are queued and applied by
+    one background thread through clock_events.apply_events, one transaction
+    (one fsync) per flush. A flush happens every GROUP_COMMIT_INTERVAL_MS
+    milliseconds or as soon as GROUP_COMMIT_MAX_EVENTS are queued; each caller
+    blocks only until the flush containing its own event has committed.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.interval = 0.005
+        self.max_events = 200
+        self.timeout = 5.0
+        self._app = None
+        self._queue = []
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pid = None
+        self.flushes = 0
+        self.events = 0
+
+    def init_app(self, app):
+        def setting(name, default):
+            return app.config.get(name, os.environ.get(name, default))
+
+        self.enabled = str(setting("GROUP_COMMIT_ENABLED", "0")).lower() in ("1", "true", "yes")
+        self.interval = float(setting("GROUP_COMMIT_INTERVAL_MS", 5)) / 1000
+        self.max_events = int(setting("GROUP_COMMIT_MAX_EVENTS", 200))
+        self.timeout = float(setting("GROUP_COMMIT_TIMEOUT", 5))
+        self._app = app
+
+    # ---------- Callers ----------
+    def submit(self, typ: str, user_id) -> dict:
+        """Queue one punch for today and wait for its outcome (same shape as apply_events)."""
+        now = datetime.utcnow()
+        pending = _Pending({
+            "type": typ,
+            "user_id": user_id,
+            "timestamp": now,
+            "date": clock_events.attendance_day(now),
+        })
+        with self._cond:
+            self._ensure_thread()
+            self._queue.append(pending)
+            if len(self._queue) == 1 or len(self._queue) >= self.max_events:
+                self._cond.notify()
+
+        if not pending.done.wait(self.timeout):
+            raise GroupCommitTimeout("Clock event was not committed in time")
+        if pending.error is not None:
+            raise pending.error
+        return pending.outcome
+
+    def _ensure_thread(self):
+        # gunicorn forks workers after import; each process needs its own flusher
+        if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+            self._thread.start()
+
+    # ---------- Flusher ----------
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            with self._app.app_context():
+                try:
+                    outcomes = clock_events.apply_events([p.event for p in batch])
+                    for pending, outcome in zip(batch, outcomes):
+                        pending.outcome = outcome
+                except Exception:
+                    db.session.rollback()
+                    self._app.logger.exception("group commit flush of %d events failed; retrying one by one", len(batch))
+                    self._apply_each(batch)
+                finally:
+                    db.session.remove()
+            self.flushes += 1
+            self.events += len(batch)
+            for pending in batch:
+                pending.done.set()
+
+    def _apply_each(self, batch):
+        # One bad event (or a transient lock) must not fail everyone who shared its flush
+        for pending in batch:
+            try:
+                pending.outcome = clock_events.apply_events([pending.event])[0]
+            except Exception as exc:
+                db.session.rollback()
+                pending.error = exc
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            # Give concurrent punches up to one interval to join this flush
+            deadline = time.monotonic() + self.interval
+            while len(self._queue) < self.max_events:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._queue[:self.max_events]
+            del self._queue[:self.max_events]
+            return batch
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "flushes": self.flushes,
+            "events": self.events,
+            "avgEventsPerFlush": round(self.events / self.flushes, 2) if self.flushes else None,
+        }
+
+
+group_committer = GroupCommitter()
@@ -0,0 +1,78 @@
+# services/guid_migration.py
+"""
+In-place conversion of SQLite GUID columns between 36-char text and 16-byte
+binary storage (see models.GUID and GUID_STORAGE).
+
+Column declarations are left as they are; SQLite keeps a BLOB value in a
+VARCHAR column unchanged, so only the stored values need rewriting. Run it
+with the app stopped and set GUID_STORAGE to the new mode before restarting.
+"""
+import uuid
+
+from models import GUID
+from services.user_search import rebuild_sqlite_index
+
+
+def guid_columns(metadata) -> list:
+    """(table name, column name) for every GUID column, referenced tables first."""
+    return [
+        (table.name, column.name)
+        for table in metadata.sorted_tables
+        for column in table.columns
+        if isinstance(column.type, GUID)
+    ]
+
+
+def _convert(value, to: str):
+    if to == "binary":
+        return uuid.UUID(value).bytes
+    return str(uuid.UUID(bytes=value))
+
+
+def migrate(engine, metadata, to: str, batch_size: int = 5000) -> dict:
+    """
+    Rewrite every GUID value not yet in `to` format ("text" or "binary") in one
+    transaction. Returns {"table.column": rows converted}.
+    """
+    if engine.dialect.name != "sqlite":
+        raise ValueError("Only SQLite databases are migrated in place; PostgreSQL uses native uuid")
+    if to not in ("text", "binary"):
+        raise ValueError("to must be 'text' or 'binary'")
+    source_type = "text" if to == "binary" else "blob"
+    converted = {}
+
+    with engine.connect() as conn:
+        # Primary and foreign keys change in separate statements; the final
+        # foreign_key_check proves the references still line up.
+        conn.exec_driver_sql("PRAGMA foreign_keys = OFF")
+        conn.commit()
+        try:
+            for table, column in guid_columns(metadata):
+                rows = conn.exec_driver_sql(
+                    f'SELECT rowid, "{column}" FROM "{table}" WHERE typeof("{column}") = ?',
+                    (source_type,),
+                ).all()
+                for start in range(0, len(rows), batch_size):
+                    conn.exec_driver_sql(
+                        f'UPDATE "{table}" SET "{column}" = ? WHERE rowid = ?',
+                        [(_convert(value, to), rowid) for rowid, value in rows[start:start + batch_size]],
+                    )
+                converted[f"{table}.{column}"] = len(rows)
+            problems = conn.exec_driver_sql("PRAGMA foreign_key_check").all()
+            if problems:
+                raise RuntimeError(f"foreign key check failed after conversion: {problems[:5]}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.exec_driver_sql("PRAGMA foreign_keys = ON")
+            conn.commit()
+        # Rebuild the tables and indexes at their new, smaller size
+        conn.exec_driver_sql("VACUUM")
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.commit()
+        # VACUUM may renumber users' rowids, which the search index is keyed on
+        rebuild_sqlite_index(conn)
+        conn.commit()
+    return converted
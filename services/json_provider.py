@@ -0,0 +1,84 @@
+# services/json_provider.py
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib json module is used instead
+    orjson = None
+
+
+def _default(o):
+    """Types neither encoder handles natively, converted the same way for both."""
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if isinstance(o, Decimal):
+        return str(o)
+    return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by orjson when it is installed (JSON_BACKEND=auto,
+    the default) and by the stdlib json module otherwise or with
+    JSON_BACKEND=stdlib.
+
+    Both backends write dates, datetimes and UUIDs as ISO 8601 / canonical
+    strings and Decimals as strings, so endpoints can hand raw column values
+    to jsonify. orjson writes non-ASCII characters as UTF-8 rather than
+    \\u escapes; the decoded JSON is the same.
+    """
+
+    default = staticmethod(_default)
+
+    def __init__(self, app, backend: str = "auto"):
+        super().__init__(app)
+        if backend not in ("auto", "orjson", "stdlib"):
+            raise ValueError(f"Unknown JSON_BACKEND {backend!r} (use 'auto', 'orjson' or 'stdlib')")
+        if backend == "orjson" and orjson is None:
+            raise RuntimeError("JSON_BACKEND=orjson but orjson is not installed")
+        self.use_orjson = orjson is not None and backend != "stdlib"
+
+    @property
+    def backend(self) -> str:
+        return "orjson" if self.use_orjson else "stdlib"
+
+    def _orjson_options(self, indent: bool) -> int:
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs) -> str:
+        # Extra json.dumps arguments (cls, separators, ...) are only understood by the stdlib
+        if not self.use_orjson or set(kwargs) - {"indent"}:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=self._orjson_options(bool(kwargs.get("indent")))).decode()
+
+    def loads(self, s, **kwargs):
+        if not self.use_orjson or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if not self.use_orjson:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=_default, option=self._orjson_options(indent) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json(app):
+    """Install FastJSONProvider as app.json (backend from JSON_BACKEND)."""
+    import os
+    backend = app.config.get("JSON_BACKEND", os.environ.get("JSON_BACKEND", "auto"))
+    app.json = FastJSONProvider(app, backend)
+    return app.json
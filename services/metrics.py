@@ -0,0 +1,182 @@
+# services/metrics.py
+"""
+Optional Prometheus metrics at GET /metrics (METRICS_ENABLED=1, needs the
+prometheus_client package).
+
+- http_request_duration_seconds{blueprint,endpoint,method}   histogram
+- http_requests_total{blueprint,endpoint,method,status}       counter
+- db_pool_connections_in_use{engine}, db_pool_size{engine}    gauges
+- db_pool_checkout_wait_seconds{engine}                       histogram
+- bcrypt_duration_seconds{operation}, bcrypt_queue_wait_seconds{operation}
+- clock_events_total{type,result}                             counter
+
+Multi-worker gunicorn: set PROMETHEUS_MULTIPROC_DIR to an empty directory
+shared by the workers (gunicorn.conf.py does this) and every worker writes
+its samples there; a scrape of any worker returns the sum over all of them.
+
+Recording is a couple of dict lookups and lock-free increments per request,
+cheap enough to leave on. METRICS_TOKEN, when set, must be sent as a
+Bearer token to read /metrics.
+"""
+import os
+import time
+
+from flask import Response, g, jsonify, request
+
+from database import READ_REPLICA, db
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:  # optional; /metrics is only available when installed
+    prometheus_client = None
+
+_BCRYPT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0)
+_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+
+
+class _Metrics:
+    """The process's metric objects; prometheus_client allows registering each name once."""
+
+    def __init__(self):
+        from prometheus_client import Counter, Gauge, Histogram
+
+        self.request_duration = Histogram(
+            "http_request_duration_seconds", "Time to produce a response",
+            ["blueprint", "endpoint", "method"],
+        )
+        self.requests = Counter(
+            "http_requests_total", "Responses by status code",
+            ["blueprint", "endpoint", "method", "status"],
+        )
+        self.pool_in_use = Gauge(
+            "db_pool_connections_in_use", "Connections checked out of the pool",
+            ["engine"], multiprocess_mode="livesum",
+        )
+        self.pool_size = Gauge(
+            "db_pool_size", "Configured pool size",
+            ["engine"], multiprocess_mode="livesum",
+        )
+        self.pool_wait = Histogram(
+            "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection",
+            ["engine"], buckets=_WAIT_BUCKETS,
+        )
+        self.bcrypt_duration = Histogram(
+            "bcrypt_duration_seconds", "bcrypt hash/verify time",
+            ["operation"], buckets=_BCRYPT_BUCKETS,
+        )
+        self.bcrypt_wait = Histogram(
+            "bcrypt_queue_wait_seconds", "Time a bcrypt job waited for an executor thread",
+            ["operation"], buckets=_WAIT_BUCKETS,
+        )
+        self.clock_events = Counter(
+            "clock_events_total", "Clock-in/clock-out events by outcome",
+            ["type", "result"],
+        )
+
+
+class Metrics:
+    """Records into _Metrics from Flask request hooks, SQLAlchemy pool events and service observers."""
+
+    def __init__(self):
+        self.enabled = False
+        self.token = None
+        self._metrics = None
+        self._children = {}
+
+    def init_app(self, app):
+        def setting(name, default):
+            return app.config.get(name, os.environ.get(name, default))
+
+        self.enabled = str(setting("METRICS_ENABLED", "0")).lower() in ("1", "true", "yes")
+        if not self.enabled:
+            return
+        if prometheus_client is None:
+            raise RuntimeError("METRICS_ENABLED=1 but prometheus_client is not installed")
+        self.token = setting("METRICS_TOKEN", None) or None
+        if self._metrics is None:
+            self._metrics = _Metrics()
+        self._children = {}
+
+        with app.app_context():
+            engines = {"primary": db.engine}
+            if READ_REPLICA in db.engines:
+                engines["replica"] = db.engines[READ_REPLICA]
+            for name, engine in engines.items():
+                self._watch_pool(name, engine)
+        from services.passwords import password_hasher
+        if self._observe_bcrypt not in password_hasher.observers:
+            password_hasher.observers.append(self._observe_bcrypt)
+
+        app.before_request(_start_timer)
+        app.after_request(self._record_request)
+        app.add_url_rule("/metrics", "metrics", self._expose, methods=["GET"])
+
+    def _watch_pool(self, name, engine):
+        from sqlalchemy import event
+
+        in_use = self._metrics.pool_in_use.labels(name)
+        size = getattr(engine.pool, "size", None)
+        if callable(size):
+            # Set from each process's first connection, so workers forked
+            # from a preloaded master report their own pool, not the master's
+            pool_size = self._metrics.pool_size.labels(name)
+            event.listen(engine, "connect", lambda *args: pool_size.set(size()))
+        event.listen(engine, "checkout", lambda *args: in_use.inc())
+        event.listen(engine, "checkin", lambda *args: in_use.dec())
+        wait_stats = getattr(engine.pool, "wait_stats", None)
+        if wait_stats is not None:
+            wait_stats.observers.append(self._metrics.pool_wait.labels(name).observe)
+
+    # ---------- Recording ----------
+    def _record_request(self, response):
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return response
+        key = (request.blueprint, request.endpoint, request.method, response.status_code)
+        children = self._children.get(key)
+        if children is None:
+            blueprint, endpoint = request.blueprint or "", request.endpoint or "<unmatched>"
+            children = self._children[key] = (
+                self._metrics.request_duration.labels(blueprint, endpoint, request.method),
+                self._metrics.requests.labels(blueprint, endpoint, request.method, str(response.status_code)),
+            )
+        children[0].observe(time.perf_counter() - started)
+        children[1].inc()
+        return response
+
+    def _observe_bcrypt(self, operation, waited, took):
+        self._metrics.bcrypt_wait.labels(operation).observe(waited)
+        self._metrics.bcrypt_duration.labels(operation).observe(took)
+
+    def clock_events(self, pairs):
+        """Count (type, outcome) pairs from clock_events; result is "ok" or the rejection code."""
+        if not self.enabled:
+            return
+        for typ, outcome in pairs:
+            result = outcome.get("error", "rejected") if outcome["status"] == "rejected" else "ok"
+            self._metrics.clock_events.labels(typ or "invalid", result).inc()
+
+    # ---------- Exposition ----------
+    def _expose(self):
+        if self.token and request.headers.get("Authorization") != f"Bearer {self.token}":
+            return jsonify({"error": "Unauthorized"}), 401
+        if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            registry = prometheus_client.CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = prometheus_client.REGISTRY
+        return Response(prometheus_client.generate_latest(registry), content_type=prometheus_client.CONTENT_TYPE_LATEST)
+
+
+def _start_timer():
+    g.metrics_started = time.perf_counter()
+
+
+def mark_process_dead(pid):
+    """gunicorn child_exit hook: drop a dead worker's live gauges from the shared directory."""
+    if prometheus_client is not None and os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
+
+
+metrics = Metrics()
@@ -0,0 +1,21 @@
+# services/pagination.py
+import base64
+import json
+
+
+def encode_cursor(values) -> str:
+    """Opaque, URL-safe cursor for a keyset position (a list of JSON-able values)."""
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> list:
+    """Inverse of encode_cursor; raises ValueError for tampered or malformed cursors."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
@@ -0,0 +1,197 @@
+# services/passwords.py
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, jsonify
+
+from database import bcrypt
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the bcrypt executor is at its concurrency cap and its queue is full."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing/verification on a bounded thread pool.
+
+    At most BCRYPT_MAX_CONCURRENCY hashes run at once (bcrypt releases the
+    GIL, so they use real cores) and at most BCRYPT_QUEUE_DEPTH more may wait.
+    Anything beyond that is rejected immediately with PasswordHasherBusy, so a
+    login storm cannot tie up every request thread behind bcrypt. Limits are
+    per worker process.
+    """
+
+    def __init__(self):
+        self.max_concurrency = os.cpu_count() or 2
+        self.queue_depth = self.max_concurrency * 2
+        self._executor = None
+        self._pid = None
+        self._slots = threading.BoundedSemaphore(self.max_concurrency + self.queue_depth)
+        self._lock = threading.Lock()
+        self.observers = []  # callables(operation, queue_wait, hash_time), e.g. metrics histograms
+        self._stats = {
+            "hashes": 0,
+            "verifications": 0,
+            "rejected": 0,
+            "inFlight": 0,
+            "queueWaitTotal": 0.0,
+            "queueWaitMax": 0.0,
+            "hashTimeTotal": 0.0,
+            "hashTimeMax": 0.0,
+        }
+
+    def init_app(self, app):
+        self.max_concurrency = int(app.config.get(
+            "BCRYPT_MAX_CONCURRENCY", os.environ.get("BCRYPT_MAX_CONCURRENCY", self.max_concurrency)
+        ))
+        self.queue_depth = int(app.config.get(
+            "BCRYPT_QUEUE_DEPTH", os.environ.get("BCRYPT_QUEUE_DEPTH", self.max_concurrency * 2)
+        ))
+        self._slots = threading.BoundedSemaphore(self.max_concurrency + self.queue_depth)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        app.register_error_handler(PasswordHasherBusy, _busy_response)
+
+    # ---------- Public API ----------
+    def hash(self, password: str) -> str:
+        cost = self.target_cost
+        return self._run("hash", lambda: bcrypt.generate_password_hash(password, cost).decode("utf-8"))
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        return self._run("verify", lambda: bcrypt.check_password_hash(password_hash, password))
+
+    @property
+    def target_cost(self) -> int:
+        """Work factor for new hashes: the app's BCRYPT_LOG_ROUNDS."""
+        return int(current_app.config["BCRYPT_LOG_ROUNDS"])
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """True when `password_hash` was made with a different cost than the target."""
+        return hash_cost(password_hash) != self.target_cost
+
+    # ---------- Internals ----------
+    def _pool(self):
+        # Threads do not survive fork; gunicorn workers each build their own pool
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(self.max_concurrency, thread_name_prefix="bcrypt")
+                    self._pid = os.getpid()
+        return self._executor
+
+    def _run(self, operation: str, fn):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise PasswordHasherBusy("Password hashing capacity exceeded")
+        with self._lock:
+            self._stats["inFlight"] += 1
+        submitted = time.perf_counter()
+        try:
+            return self._pool().submit(self._timed, operation, fn, submitted).result()
+        finally:
+            with self._lock:
+                self._stats["inFlight"] -= 1
+            self._slots.release()
+
+    def _timed(self, operation, fn, submitted):
+        started = time.perf_counter()
+        try:
+            return fn()
+        finally:
+            finished = time.perf_counter()
+            waited, took = started - submitted, finished - started
+            with self._lock:
+                self._stats["hashes" if operation == "hash" else "verifications"] += 1
+                self._stats["queueWaitTotal"] += waited
+                self._stats["queueWaitMax"] = max(self._stats["queueWaitMax"], waited)
+                self._stats["hashTimeTotal"] += took
+                self._stats["hashTimeMax"] = max(self._stats["hashTimeMax"], took)
+            for observe in self.observers:
+                observe(operation, waited, took)
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+        done = s["hashes"] + s["verifications"]
+        return {
+            "maxConcurrency": self.max_concurrency,
+            "queueDepth": self.queue_depth,
+            "inFlight": s["inFlight"],
+            "hashes": s["hashes"],
+            "verifications": s["verifications"],
+            "rejected": s["rejected"],
+            "avgQueueWaitMs": round(s["queueWaitTotal"] / done * 1000, 3) if done else None,
+            "maxQueueWaitMs": round(s["queueWaitMax"] * 1000, 3),
+            "avgHashMs": round(s["hashTimeTotal"] / done * 1000, 3) if done else None,
+            "maxHashMs": round(s["hashTimeMax"] * 1000, 3),
+        }
+
+
+def hash_cost(password_hash: str):
+    """Cost parsed from a modular-crypt bcrypt hash ("$2b$12$..."), or None if unparseable."""
+    parts = (password_hash or "").split("$")
+    try:
+        return int(parts[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def calibrate(costs, samples: int = 5, give_up_after: float = None):
+    """
+    Time bcrypt on this host for each cost in `costs`.
+    Yields (cost, median_seconds, max_seconds); stops early once a cost's
+    median exceeds `give_up_after` seconds.
+    """
+    import bcrypt as _bcrypt
+
+    for cost in costs:
+        timings = []
+        for _ in range(samples):
+            salt = _bcrypt.gensalt(rounds=cost)
+            started = time.perf_counter()
+            _bcrypt.hashpw(b"calibration-password", salt)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        median = timings[len(timings) // 2]
+        yield cost, median, timings[-1]
+        if give_up_after is not None and median > give_up_after:
+            break
+
+
+def _hash_one(args):
+    import bcrypt as _bcrypt
+
+    password, cost = args
+    return _bcrypt.hashpw(password.encode("utf-8"), _bcrypt.gensalt(rounds=cost)).decode("utf-8")
+
+
+def hash_many(passwords, cost: int, workers: int = None) -> list:
+    """
+    Hash a list of passwords on a short-lived thread pool (bulk imports).
+    bcrypt releases the GIL, so threads use every core without spawning
+    processes. Bypasses the request-path admission control; callers bound
+    the batch (IMPORT_MAX_PASSWORDS over HTTP, the import-employees CLI
+    for larger files).
+    """
+    if not passwords:
+        return []
+    workers = min(workers or os.cpu_count() or 2, len(passwords))
+    if workers <= 1:
+        return [_hash_one((p, cost)) for p in passwords]
+    with ThreadPoolExecutor(workers, thread_name_prefix="bcrypt-import") as pool:
+        return list(pool.map(_hash_one, [(p, cost) for p in passwords]))
+
+
+def _busy_response(exc):
+    resp = jsonify({"error": "Server busy, please retry"})
+    resp.status_code = 503
+    resp.headers["Retry-After"] = "1"
+    return resp
+
+
+password_hasher = PasswordHasher()
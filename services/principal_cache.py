@@ -0,0 +1,149 @@
+# services/principal_cache.py
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+
+from database import db
+from models import User
+
+# Key in Session.info where ids of users touched by the current transaction are collected
+_PENDING_KEY = "principal_cache_pending"
+
+
+class PrincipalCache:
+    """
+    In-process LRU + TTL cache of authenticated users, keyed by user id.
+
+    Stores a plain snapshot of the users row (never an ORM instance, which is
+    bound to a request session) and re-attaches it to the current session on
+    a hit, so `g.current_user` stays a regular `User` object.
+
+    The cache is per worker process: invalidation on commit only reaches the
+    worker that made the change, other workers pick it up once the TTL expires.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 30.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def init_app(self, app):
+        self.max_size = int(app.config.get(
+            "PRINCIPAL_CACHE_SIZE", os.environ.get("PRINCIPAL_CACHE_SIZE", self.max_size)
+        ))
+        self.ttl_seconds = float(app.config.get(
+            "PRINCIPAL_CACHE_TTL", os.environ.get("PRINCIPAL_CACHE_TTL", self.ttl_seconds)
+        ))
+        self.clear()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    # ---------- Lookup ----------
+    def get_user(self, user_id):
+        """Return a session-attached User for `user_id`, or None if it does not exist."""
+        key = str(user_id)
+        if not self.enabled:
+            return User.query.filter_by(id=user_id).first()
+
+        snapshot = self._get(key)
+        if snapshot is not None:
+            return _attach(snapshot)
+
+        user = User.query.filter_by(id=user_id).first()
+        if user is not None:
+            self._put(key, _snapshot(user))
+        return user
+
+    def _get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def _put(self, key, snapshot):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    # ---------- Invalidation ----------
+    def invalidate(self, user_id):
+        with self._lock:
+            if self._entries.pop(str(user_id), None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "maxSize": self.max_size,
+                "ttlSeconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hitRatio": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+def _snapshot(user: User) -> dict:
+    return {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+
+
+def _attach(snapshot: dict) -> User:
+    """Turn a cached snapshot back into a persistent User without a SELECT."""
+    existing = db.session.identity_map.get(identity_key(User, snapshot["id"]))
+    if existing is not None:
+        return existing
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    db.session.add(user)
+    return user
+
+
+principal_cache = PrincipalCache()
+
+
+# ---------- Commit hooks ----------
+# Any flushed change to a User (profile edit, status/role change, password
+# change, delete) drops the cached principal once the transaction commits.
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    changed = [obj.id for obj in list(session.dirty) + list(session.deleted) if isinstance(obj, User)]
+    if changed:
+        session.info.setdefault(_PENDING_KEY, set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_changed_users(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,183 @@
+# services/query_stats.py
+import logging
+import os
+import re
+import threading
+import time
+
+from flask import g, has_app_context, has_request_context, request
+from sqlalchemy import event
+
+from database import db
+
+logger = logging.getLogger("sql")
+
+# IN (?, ?, ...) lists of any length are one statement shape
+_EXPANDED_LIST = re.compile(r"\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*,)+\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    return _EXPANDED_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class RequestQueries:
+    """Statements executed during one request."""
+
+    __slots__ = ("count", "total", "slowest", "slowest_statement", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_statement = None
+        self.shapes = {}
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.total += elapsed
+        if elapsed >= self.slowest:
+            self.slowest = elapsed
+            self.slowest_statement = statement
+        shape = statement_shape(statement)
+        self.shapes[shape] = self.shapes.get(shape, 0) + 1
+
+    def repeated(self, threshold: int) -> list:
+        """(shape, count) of statements run more than `threshold` times, most repeated first."""
+        found = [(shape, n) for shape, n in self.shapes.items() if n > threshold]
+        return sorted(found, key=lambda item: -item[1])
+
+
+class QueryInstrumentation:
+    """
+    Per-request SQL statistics from engine cursor events.
+
+    For every request: query count, total DB time and the slowest statement,
+    optionally returned as X-DB-* and Server-Timing response headers
+    (SQL_STATS_HEADERS). Statements slower than SLOW_QUERY_MS are logged on
+    the "sql" logger, and a request that runs the same statement shape more
+    than N_PLUS_ONE_THRESHOLD times is flagged as a likely N+1 (logged once
+    per endpoint and statement, counted in stats()).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.headers = False
+        self.slow_after = 0.2
+        self.n_plus_one_threshold = 10
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.queries = 0
+        self.slow_queries = 0
+        self._n_plus_one = {}
+
+    def init_app(self, app):
+        def setting(name, default):
+            return app.config.get(name, os.environ.get(name, default))
+
+        def flag(name, default):
+            return str(setting(name, default)).lower() in ("1", "true", "yes")
+
+        self.enabled = flag("SQL_INSTRUMENTATION", "1")
+        self.headers = flag("SQL_STATS_HEADERS", "0")
+        self.slow_after = float(setting("SLOW_QUERY_MS", 200)) / 1000
+        self.n_plus_one_threshold = int(setting("N_PLUS_ONE_THRESHOLD", 10))
+        if not self.enabled:
+            return
+
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+                event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        app.before_request(_start_request)
+        app.after_request(self._finish_request)
+
+    # ---------- Engine events ----------
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        queries = g.get("sql_queries") if has_app_context() else None
+        if queries is not None:
+            queries.record(statement, elapsed)
+        if self.slow_after > 0 and elapsed >= self.slow_after:
+            with self._lock:
+                self.slow_queries += 1
+            where = f"{request.method} {request.path}" if has_request_context() else "background"
+            logger.warning("Slow query (%.1f ms, %s): %s", elapsed * 1000, where, _one_line(statement, 1000))
+
+    # ---------- Request hooks ----------
+    def _finish_request(self, response):
+        queries = g.pop("sql_queries", None)
+        if queries is None:
+            return response
+        repeated = queries.repeated(self.n_plus_one_threshold) if self.n_plus_one_threshold > 0 else []
+        with self._lock:
+            self.requests += 1
+            self.queries += queries.count
+        if repeated:
+            self._flag_n_plus_one(request.endpoint or request.path, repeated)
+
+        if self.headers:
+            total_ms, slowest_ms = queries.total * 1000, queries.slowest * 1000
+            response.headers["X-DB-Query-Count"] = str(queries.count)
+            response.headers["X-DB-Time-Ms"] = f"{total_ms:.2f}"
+            response.headers["Server-Timing"] = f'db;dur={total_ms:.2f};desc="{queries.count} queries"'
+            if queries.slowest_statement:
+                response.headers["X-DB-Slowest-Ms"] = f"{slowest_ms:.2f}"
+                response.headers["X-DB-Slowest-Statement"] = _one_line(queries.slowest_statement, 200)
+            if repeated:
+                shape, count = repeated[0]
+                response.headers["X-DB-N-Plus-One"] = f"{count}x {_one_line(shape, 200)}"
+        return response
+
+    def _flag_n_plus_one(self, endpoint: str, repeated: list):
+        for shape, count in repeated:
+            key = (endpoint, shape)
+            with self._lock:
+                entry = self._n_plus_one.get(key)
+                first = entry is None
+                if first:
+                    entry = self._n_plus_one[key] = {"requests": 0, "maxRepeats": 0}
+                entry["requests"] += 1
+                entry["maxRepeats"] = max(entry["maxRepeats"], count)
+            if first:
+                logger.warning("Likely N+1 in %s: statement ran %d times: %s", endpoint, count, _one_line(shape, 1000))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "requests": self.requests,
+                "queries": self.queries,
+                "avgQueriesPerRequest": round(self.queries / self.requests, 2) if self.requests else None,
+                "slowQueries": self.slow_queries,
+                "slowQueryMs": self.slow_after * 1000,
+                "nPlusOneThreshold": self.n_plus_one_threshold,
+                "nPlusOne": [
+                    {"endpoint": endpoint, "statement": _one_line(shape, 300), **entry}
+                    for (endpoint, shape), entry in sorted(
+                        self._n_plus_one.items(), key=lambda item: -item[1]["requests"]
+                    )
+                ],
+            }
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+def _start_request():
+    g.sql_queries = RequestQueries()
+
+
+def _one_line(statement: str, limit: int) -> str:
+    """Single-line, header-safe (latin-1) excerpt of a statement."""
+    text = _WHITESPACE.sub(" ", statement).strip()
+    text = text.encode("latin-1", "replace").decode("latin-1")
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+query_instrumentation = QueryInstrumentation()
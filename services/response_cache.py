@@ -0,0 +1,316 @@
+# services/response_cache.py
+import hashlib
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from functools import wraps
+
+from flask import Response, current_app, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import AttendanceRecord, DailyAttendanceSummary, User
+
+# Key in Session.info set when a transaction writes attendance or employee data
+_PENDING_KEY = "response_cache_bump"
+
+# Writes to these tables change what the cached endpoints return
+_TRACKED_TABLES = frozenset(m.__tablename__ for m in (AttendanceRecord, DailyAttendanceSummary, User))
+_TRACKED_MODELS = (AttendanceRecord, DailyAttendanceSummary, User)
+
+
+# ---------- In-memory backend ----------
+class MemoryResponseStore:
+    """
+    Per-process LRU of rendered responses and a per-process data version.
+    Only writes made by this process bump the version, so writes from other
+    workers or CLI commands show up once the entry's TTL expires (304s
+    included); use SqliteResponseStore for exact invalidation across
+    processes.
+    """
+
+    def __init__(self, max_size: int = 256, ttl_seconds: float = 30.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._pid = None
+        self._boot = None
+        self._version = 0
+
+    def _check_process(self):
+        # ETags must not collide with those of another process: workers forked
+        # from a preloaded master would otherwise share its token and counter
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._boot = secrets.token_hex(4)
+                    self._version = 0
+                    self._entries.clear()
+                    self._pid = os.getpid()
+
+    def version(self) -> str:
+        self._check_process()
+        return f"{self._boot}-{self._version}"
+
+    def bump(self):
+        self._check_process()
+        with self._lock:
+            self._version += 1
+
+    def get(self, key):
+        self._check_process()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        self._check_process()
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+# ---------- Shared SQLite file backend ----------
+class SqliteResponseStore:
+    """
+    Responses and the data version in a separate SQLite file shared by every
+    worker on the host. A bump from any worker is seen by all of them on
+    their next request, and reading the version never touches the app's
+    database. Entries older than the TTL are purged every purge_every sets.
+    """
+
+    def __init__(self, path: str, max_size: int = 1024, ttl_seconds: float = 300.0, purge_every: int = 100):
+        self.path = path
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.purge_every = purge_every
+        self._local = threading.local()
+        self._sets = 0
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS versions (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, body BLOB NOT NULL, mimetype TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("INSERT OR IGNORE INTO versions VALUES ('attendance', 0)")
+
+    def _connect(self):
+        # One connection per thread and process (sqlite3 connections do not survive fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def version(self) -> str:
+        row = self._connect().execute("SELECT value FROM versions WHERE name = 'attendance'").fetchone()
+        return str(row[0] if row else 0)
+
+    def bump(self):
+        self._connect().execute("UPDATE versions SET value = value + 1 WHERE name = 'attendance'")
+
+    def get(self, key):
+        row = self._connect().execute(
+            "SELECT body, mimetype FROM entries WHERE key = ? AND expires_at >= ?", (key, time.time())
+        ).fetchone()
+        return None if row is None else (bytes(row[0]), row[1])
+
+    def set(self, key, value):
+        body, mimetype = value
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+            (key, body, mimetype, time.time() + self.ttl_seconds),
+        )
+        self._sets += 1
+        if self._sets % self.purge_every == 0:
+            conn.execute("DELETE FROM entries WHERE expires_at < ?", (time.time(),))
+            conn.execute(
+                "DELETE FROM entries WHERE key NOT IN (SELECT key FROM entries ORDER BY expires_at DESC LIMIT ?)",
+                (self.max_size,),
+            )
+
+    def size(self) -> int:
+        return self._connect().execute("SELECT count(*) FROM entries").fetchone()[0]
+
+
+class ResponseCache:
+    """
+    Versioned cache of GET report responses (see cached_response).
+
+    Every committed transaction that writes users, attendance_records or
+    daily_attendance_summary bumps one data version. Responses are cached
+    under (endpoint, query string, today, version) and carry a strong ETag
+    derived from that key. A poll with a matching If-None-Match gets a 304
+    while the entry is still cached (so RESPONSE_CACHE_TTL bounds staleness
+    for 304s too), after reading only the version and the cache: no query
+    runs against the app's database. Writes made outside the app (raw SQL,
+    another service) are not seen until entries expire.
+
+    RESPONSE_CACHE=memory (the default for single-process use) only sees
+    this process's writes. Multi-worker deployments should use sqlite,
+    which gunicorn.conf.py and start.sh select by default; run maintenance
+    commands (seed, rebuild-summary, init-db) with the same setting so
+    their writes invalidate the workers' caches too.
+    """
+
+    def __init__(self):
+        self.store = None
+        self.namespace = ""
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.bumps = 0
+        self._logger = None
+
+    def init_app(self, app):
+        def setting(name, default):
+            return app.config.get(name, os.environ.get(name, default))
+
+        backend = setting("RESPONSE_CACHE", "memory")
+        max_size = int(setting("RESPONSE_CACHE_SIZE", 256))
+        if backend == "off":
+            self.store = None
+        elif backend == "memory":
+            self.store = MemoryResponseStore(max_size, float(setting("RESPONSE_CACHE_TTL", 30)))
+        elif backend == "sqlite":
+            path = setting("RESPONSE_CACHE_PATH", os.path.join(app.instance_path, "response_cache.sqlite"))
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.store = SqliteResponseStore(path, max_size, float(setting("RESPONSE_CACHE_TTL", 300)))
+        else:
+            raise ValueError(f"Unknown RESPONSE_CACHE {backend!r} (use 'memory', 'sqlite' or 'off')")
+        # Apps on different databases may share a cache file; keep their keys apart
+        self.namespace = hashlib.blake2b(
+            str(app.config.get("SQLALCHEMY_DATABASE_URI")).encode("utf-8"), digest_size=4
+        ).hexdigest()
+        self._logger = app.logger
+        with self._lock:
+            self.hits = self.misses = self.not_modified = self.bumps = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.store is not None
+
+    def bump(self):
+        if self.store is None:
+            return
+        try:
+            self.store.bump()
+        except sqlite3.Error:
+            # Runs after the app's commit; never turn a saved write into an error
+            self._logger.exception("response cache version bump failed")
+            return
+        with self._lock:
+            self.bumps += 1
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {"hits": self.hits, "misses": self.misses, "notModified": self.not_modified, "bumps": self.bumps}
+        if self.store is None:
+            return {"enabled": False, **counts}
+        return {
+            "enabled": True,
+            "backend": type(self.store).__name__,
+            "version": self.store.version(),
+            "size": self.store.size(),
+            **counts,
+        }
+
+
+response_cache = ResponseCache()
+
+
+def cached_response(view):
+    """
+    Cache a read-only GET view's 200 responses per data version and answer
+    If-None-Match with 304. Place it below the auth decorators so access is
+    still checked on every request.
+    """
+    @wraps(view)
+    def decorated(*args, **kwargs):
+        store = response_cache.store
+        if store is None or request.method != "GET":
+            return view(*args, **kwargs)
+
+        params = "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+        key = f"{response_cache.namespace}:{request.endpoint}?{params}|{date.today().isoformat()}|{store.version()}"
+        etag = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+        cached = store.get(key)
+        if cached is not None and request.if_none_match.contains(etag):
+            response_cache._count("not_modified")
+            return _with_validators(Response(status=304), etag)
+        if cached is not None:
+            response_cache._count("hits")
+            body, mimetype = cached
+            return _with_validators(Response(body, mimetype=mimetype), etag, "HIT")
+
+        response_cache._count("misses")
+        response = current_app.make_response(view(*args, **kwargs))
+        if response.status_code != 200 or response.is_streamed:
+            return response
+        store.set(key, (response.get_data(), response.mimetype))
+        return _with_validators(response, etag, "MISS")
+
+    return decorated
+
+
+def _with_validators(response, etag, outcome=None):
+    response.set_etag(etag)
+    # Clients may keep the response but must revalidate it on every poll
+    response.headers["Cache-Control"] = "private, no-cache"
+    if outcome:
+        response.headers["X-Cache"] = outcome
+    return response
+
+
+# ---------- Commit hooks ----------
+# Any committed write to users, attendance_records or the daily rollup
+# (ORM flushes and bulk INSERT/UPDATE/DELETE through the session) bumps the
+# data version once per transaction.
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_writes(session, flush_context):
+    if any(isinstance(obj, _TRACKED_MODELS) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info[_PENDING_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_writes(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if getattr(table, "name", None) in _TRACKED_TABLES:
+            orm_execute_state.session.info[_PENDING_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_version(session):
+    if session.info.pop(_PENDING_KEY, False):
+        response_cache.bump()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_writes(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
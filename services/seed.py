@@ -0,0 +1,164 @@
+# services/seed.py
+"""
+Synthetic users, attendance history and WebAuthn credentials at
+production-like scale, for local benchmarking (`flask --app app seed`).
+
+Not for production databases: every seeded user shares one password.
+"""
+import random
+import uuid
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from sqlalchemy import func, insert, select
+
+from database import db
+from models import AttendanceRecord, User, WebAuthnCredential
+from services import attendance_summary
+from services.attendance_stats import late_cutoff
+from services.passwords import hash_many, password_hasher
+
+SEED_PASSWORD = "Password123!"
+SEED_EMAIL_DOMAIN = "seed.example.com"
+DEPARTMENTS = ("Production", "Warehouse", "Sales", "Office", "Quality", "Maintenance")
+
+_FIRST_NAMES = (
+    "Ada", "Ben", "Chloe", "Daniel", "Efua", "Femi", "Grace", "Hassan", "Ines", "James",
+    "Kemi", "Liam", "Maria", "Nadia", "Oscar", "Priya", "Quinn", "Rosa", "Samuel", "Tunde",
+    "Uche", "Vera", "Wale", "Xin", "Yusuf", "Zara",
+)
+_LAST_NAMES = (
+    "Adeyemi", "Brown", "Chen", "Davies", "Eze", "Fischer", "Garcia", "Hughes", "Ibrahim",
+    "Johnson", "Kowalski", "Lopez", "Mensah", "Nguyen", "Okafor", "Patel", "Rossi", "Smith",
+    "Taylor", "Usman", "Walker", "Yamamoto",
+)
+
+
+def seed(users: int, days: int, end: date = None, departments=DEPARTMENTS,
+         absent_rate: float = 0.08, late_rate: float = 0.12, missing_clock_out_rate: float = 0.03,
+         webauthn_rate: float = 0.4, weekends: bool = False, rng_seed: int = None,
+         bcrypt_cost: int = None, batch_size: int = 5000) -> dict:
+    """
+    Insert `users` employees and `days` days of attendance ending at `end`
+    (default yesterday, so today's punches are left to the caller).
+
+    On each working day a user is absent with probability absent_rate,
+    otherwise clocks in around 08:40 (after LATE_CUTOFF with probability
+    late_rate) and out about 8.5 hours later; missing_clock_out_rate of
+    the days have no clock-out. webauthn_rate of the users get one or two
+    credentials. The daily rollup is rebuilt for the seeded range.
+    Returns counts of the rows written.
+    """
+    rng = random.Random(rng_seed)
+    end = end or date.today() - timedelta(days=1)
+    start = end - timedelta(days=days - 1)
+    cutoff = datetime.combine(date.min, late_cutoff())
+    password_hash = hash_many([SEED_PASSWORD], bcrypt_cost or password_hasher.target_cost, 1)[0]
+
+    # Continue numbering after earlier seed runs so emails stay unique
+    offset = db.session.execute(
+        select(func.count()).select_from(User).where(User.email.like(f"%@{SEED_EMAIL_DOMAIN}"))
+    ).scalar()
+
+    user_rows, counts = [], {"users": 0, "attendance_records": 0, "webauthn_credentials": 0}
+    for n in range(offset, offset + users):
+        first, last = rng.choice(_FIRST_NAMES), rng.choice(_LAST_NAMES)
+        created = datetime.combine(start, time(8)) - timedelta(days=rng.randint(1, 720))
+        user_rows.append({
+            "id": uuid.uuid4(),
+            "name": f"{first} {last}",
+            "email": f"{first}.{last}.{n}@{SEED_EMAIL_DOMAIN}".lower(),
+            "password_hash": password_hash,
+            "role": "hr" if rng.random() < 0.01 else "employee",
+            "department": rng.choice(departments),
+            "status": "Inactive" if rng.random() < 0.05 else "Active",
+            "created_at": created,
+            "updated_at": created,
+        })
+    for i in range(0, len(user_rows), batch_size):
+        db.session.execute(insert(User), user_rows[i:i + batch_size])
+    db.session.commit()
+    counts["users"] = len(user_rows)
+
+    working_days = [
+        start + timedelta(days=d) for d in range(days)
+        if weekends or (start + timedelta(days=d)).weekday() < 5
+    ]
+    active = [u["id"] for u in user_rows if u["status"] == "Active"]
+    batch = []
+    for day in working_days:
+        for user_id in active:
+            if rng.random() < absent_rate:
+                continue
+            batch.append(_attendance_row(rng, user_id, day, cutoff, late_rate, missing_clock_out_rate))
+            if len(batch) >= batch_size:
+                counts["attendance_records"] += _flush(AttendanceRecord, batch)
+    counts["attendance_records"] += _flush(AttendanceRecord, batch)
+
+    public_key = _cose_public_key()
+    for u in user_rows:
+        if rng.random() >= webauthn_rate:
+            continue
+        for _ in range(1 if rng.random() < 0.8 else 2):
+            batch.append({
+                "id": rng.randbytes(32),
+                "user_id": u["id"],
+                "public_key": public_key,
+                "counter": rng.randint(0, 500),
+                "transports": [rng.choice(("internal", "hybrid", "usb"))],
+                "created_at": u["created_at"] + timedelta(days=rng.randint(0, 30)),
+            })
+            if len(batch) >= batch_size:
+                counts["webauthn_credentials"] += _flush(WebAuthnCredential, batch)
+    counts["webauthn_credentials"] += _flush(WebAuthnCredential, batch)
+
+    counts["daily_attendance_summary"] = attendance_summary.rebuild(start, end) if working_days else 0
+    return counts
+
+
+def _attendance_row(rng, user_id, day, cutoff, late_rate, missing_clock_out_rate) -> dict:
+    on_time_latest = (cutoff - datetime.combine(date.min, time(7, 30))).total_seconds()
+    if rng.random() < late_rate:
+        offset = on_time_latest + rng.expovariate(1 / 900) + 60  # ~15 min late on average
+    else:
+        offset = min(max(rng.gauss(on_time_latest - 1200, 900), 0), on_time_latest)
+    clock_in = datetime.combine(day, time(7, 30)) + timedelta(seconds=int(offset))
+    row = {
+        "id": uuid.uuid4(),
+        "user_id": user_id,
+        "date": day,
+        "clock_in": clock_in,
+        "clock_out": None,
+        "total_hours": None,
+    }
+    if rng.random() >= missing_clock_out_rate:
+        clock_out = clock_in + timedelta(seconds=int(rng.gauss(8.5 * 3600, 1800)))
+        row["clock_out"] = clock_out
+        row["total_hours"] = Decimal(str(round((clock_out - clock_in).total_seconds() / 3600, 2)))
+    return row
+
+
+def _flush(model, batch: list) -> int:
+    """executemany INSERT of `batch` into `model`'s table, committed; empties the list."""
+    if not batch:
+        return 0
+    db.session.execute(insert(model), batch)
+    db.session.commit()
+    written = len(batch)
+    batch.clear()
+    return written
+
+
+def _cose_public_key() -> bytes:
+    """One COSE-encoded P-256 public key shared by all seeded credentials (nobody holds the private key)."""
+    import cbor2
+    from cryptography.hazmat.primitives.asymmetric import ec
+
+    numbers = ec.generate_private_key(ec.SECP256R1()).public_key().public_numbers()
+    return cbor2.dumps({
+        1: 2,    # kty: EC2
+        3: -7,   # alg: ES256
+        -1: 1,   # crv: P-256
+        -2: numbers.x.to_bytes(32, "big"),
+        -3: numbers.y.to_bytes(32, "big"),
+    })
@@ -0,0 +1,142 @@
+# services/user_search.py
+"""
+Substring search over users' name, email and department.
+
+Backends, chosen by USER_SEARCH (auto | fts | like; default auto):
+- SQLite: an FTS5 table with the trigram tokenizer (users_fts), an
+  external-content index over users kept in sync by triggers, so every
+  write path (ORM, bulk imports, raw SQL) updates it.
+- PostgreSQL: pg_trgm GIN indexes on the three columns, which serve the
+  same ILIKE '%term%' query the fallback uses.
+- Anything else, or SQLite without FTS5/trigram: plain case-insensitive
+  LIKE, no index.
+
+Terms shorter than three characters have no trigrams and always use LIKE.
+"""
+import os
+
+from flask import current_app
+from sqlalchemy import literal_column, or_, select, table, column
+
+from database import db
+from models import User
+
+SEARCH_COLUMNS = ("name", "email", "department")
+MIN_INDEXED_TERM = 3
+
+_fts = table("users_fts", column("rowid"))
+
+_SQLITE_FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+        name, email, department, content='users', content_rowid='rowid', tokenize='trigram')""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, name, email, department)
+        VALUES (new.rowid, new.name, new.email, new.department);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, name, email, department)
+        VALUES ('delete', old.rowid, old.name, old.email, old.department);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_update AFTER UPDATE OF name, email, department ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, name, email, department)
+        VALUES ('delete', old.rowid, old.name, old.email, old.department);
+        INSERT INTO users_fts(rowid, name, email, department)
+        VALUES (new.rowid, new.name, new.email, new.department);
+    END""",
+]
+
+_POSTGRES_TRGM_DDL = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+    f"CREATE INDEX IF NOT EXISTS ix_users_{name}_trgm ON users USING gin ({name} gin_trgm_ops)"
+    for name in SEARCH_COLUMNS
+]
+
+
+def _mode(app) -> str:
+    mode = app.config.get("USER_SEARCH", os.environ.get("USER_SEARCH", "auto"))
+    if mode not in ("auto", "fts", "like"):
+        raise ValueError(f"Unknown USER_SEARCH {mode!r} (use 'auto', 'fts' or 'like')")
+    return mode
+
+
+def init_user_search(app):
+    """Create the search index for the configured backend (idempotent); call after create_all."""
+    mode = _mode(app)
+    backend = "like"
+    dialect = db.engine.dialect.name
+    if mode != "like" and dialect == "sqlite":
+        backend = _create_sqlite_fts(app)
+    elif mode != "like" and dialect == "postgresql":
+        backend = _create_postgres_trgm(app)
+    if mode == "fts" and backend == "like":
+        raise RuntimeError("USER_SEARCH=fts but this database cannot build a search index")
+    app.extensions["user_search"] = backend
+    return backend
+
+
+def _create_sqlite_fts(app) -> str:
+    try:
+        with db.engine.begin() as conn:
+            created = not conn.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users_fts'"
+            ).first()
+            for ddl in _SQLITE_FTS_DDL:
+                conn.exec_driver_sql(ddl)
+            if created:
+                # Index the users that existed before the table did
+                conn.exec_driver_sql("INSERT INTO users_fts(users_fts) VALUES ('rebuild')")
+    except Exception as exc:  # sqlite3 without FTS5 or the trigram tokenizer (< 3.34)
+        app.logger.warning("FTS5 trigram search unavailable, using LIKE: %s", exc)
+        return "like"
+    return "fts5"
+
+
+def _create_postgres_trgm(app) -> str:
+    try:
+        with db.engine.begin() as conn:
+            for ddl in _POSTGRES_TRGM_DDL:
+                conn.exec_driver_sql(ddl)
+    except Exception as exc:  # e.g. no permission to create the extension
+        app.logger.warning("pg_trgm indexes unavailable, using unindexed ILIKE: %s", exc)
+        return "like"
+    return "trigram"
+
+
+def rebuild_sqlite_index(conn):
+    """Re-index users_fts from users (after VACUUM, which may renumber rowids)."""
+    if conn.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE name = 'users_fts'").first():
+        conn.exec_driver_sql("INSERT INTO users_fts(users_fts) VALUES ('rebuild')")
+
+
+def backend() -> str:
+    """The current app's search backend; looked up once per process when init_user_search did not run."""
+    app = current_app._get_current_object()
+    found = app.extensions.get("user_search")
+    if found is None:
+        found = app.extensions["user_search"] = _detect(app)
+    return found
+
+
+def _detect(app) -> str:
+    if _mode(app) == "like":
+        return "like"
+    dialect = db.engine.dialect.name
+    with db.engine.connect() as conn:
+        if dialect == "sqlite" and conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users_fts'"
+        ).first():
+            return "fts5"
+        if dialect == "postgresql" and conn.exec_driver_sql(
+            "SELECT 1 FROM pg_indexes WHERE indexname = 'ix_users_name_trgm'"
+        ).first():
+            return "trigram"
+    return "like"
+
+
+def user_search_clause(term: str, columns=SEARCH_COLUMNS):
+    """WHERE clause matching users whose `columns` contain `term` (case-insensitive)."""
+    if backend() == "fts5" and len(term) >= MIN_INDEXED_TERM:
+        phrase = '"' + term.replace('"', '""') + '"'
+        query = f"{{{' '.join(columns)}}} : {phrase}"
+        matches = select(_fts.c.rowid).where(literal_column("users_fts").op("MATCH")(query))
+        return literal_column("users.rowid").in_(matches)
+    return or_(*[getattr(User, name).icontains(term, autoescape=True) for name in columns])
@@ -1,6 +1,9 @@
 # services/webauthn_service.py
 import os
+import uuid
 from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
 from webauthn import (
     generate_registration_options,
     options_to_json,
@@ -8,14 +11,19 @@ from webauthn import (
     generate_authentication_options,
     verify_authentication_response,
 )
+from webauthn.helpers import (
+    base64url_to_bytes,
+    parse_registration_credential_json,
+    parse_authentication_credential_json,
+)
 from webauthn.helpers.structs import (
     PublicKeyCredentialDescriptor,
-    RegistrationCredential,
-    AuthenticationCredential,
     AuthenticatorTransport,
 )
-from models import WebAuthnCredential
+from models import User, WebAuthnCredential
 from database import db
+from services.credential_cache import descriptor_cache
+from services.principal_cache import principal_cache
 
 
 class WebAuthnService:
@@ -32,36 +40,73 @@ class WebAuthnService:
         # For prod: "clockin-pi.vercel.app"
         return os.environ.get("WEBAUTHN_RP_ID", "clockin-pi.vercel.app")
 
+    # ---------- Users & credential descriptors ----------
     @staticmethod
-    def start_registration(user):
-        """Generate registration options for a user."""
-        existing_credentials = [
+    def load_user(user_id):
+        """The user with all their credentials eagerly loaded in one query (None if unknown)."""
+        try:
+            user_id = uuid.UUID(str(user_id))
+        except ValueError:
+            return None
+        user = db.session.execute(
+            select(User).options(joinedload(User.webauthn_credentials)).where(User.id == user_id)
+        ).unique().scalar_one_or_none()
+        if user is not None:
+            descriptor_cache.put(user.id, user.webauthn_credentials)
+        return user
+
+    @staticmethod
+    def user_for_login(user_id):
+        """
+        User for login/begin. With the descriptors already cached the user
+        comes from the principal cache, so a warm ceremony start needs no
+        SELECT at all.
+        """
+        if descriptor_cache.get(user_id) is not None:
+            return principal_cache.get_user(user_id)
+        return WebAuthnService.load_user(user_id)
+
+    @staticmethod
+    def _descriptors(user):
+        cached = descriptor_cache.get(user.id)
+        if cached is None:
+            if "webauthn_credentials" in user.__dict__:  # already eager-loaded
+                credentials = user.webauthn_credentials
+            else:
+                credentials = db.session.execute(
+                    select(WebAuthnCredential).where(WebAuthnCredential.user_id == user.id)
+                ).scalars().all()
+            cached = descriptor_cache.put(user.id, credentials)
+        return [
             PublicKeyCredentialDescriptor(
-                type="public-key",
-                id=cred.id,  # ✅ Make sure cred.id is stored as raw bytes (not hex/str)
-                transports=[AuthenticatorTransport.TRANSPORT_USB],
+                id=cred_id,  # ✅ Make sure cred.id is stored as raw bytes (not hex/str)
+                transports=_transports(transports),
             )
-            for cred in user.webauthn_credentials
+            for cred_id, transports in cached
         ]
 
+    # ---------- Ceremonies ----------
+    @staticmethod
+    def start_registration(user):
+        """Generate registration options for a user."""
         options = generate_registration_options(
             rp_id=WebAuthnService._get_rp_id(),
             rp_name="Pardee Foods Attendance",
             user_id=str(user.id).encode(),  # ✅ Correct: backend library will base64url encode
             user_name=user.email,
-            user_display_name=user.full_name or user.email,  # ✅ Add display name
-            exclude_credentials=existing_credentials,
+            user_display_name=user.name or user.email,  # ✅ Add display name
+            exclude_credentials=WebAuthnService._descriptors(user),
         )
         return options_to_json(options)  # ✅ Returns valid JSON with base64url-encoded challenge
 
     @staticmethod
     def finish_registration(user, response_json, expected_challenge: str):
         """Verify registration response and store credential."""
-        credential = RegistrationCredential.parse_raw(response_json)
+        credential = parse_registration_credential_json(response_json)
 
         verification = verify_registration_response(
             credential=credential,
-            expected_challenge=expected_challenge,
+            expected_challenge=base64url_to_bytes(expected_challenge),
             expected_origin=WebAuthnService._get_origin(),
             expected_rp_id=WebAuthnService._get_rp_id(),
         )
@@ -83,31 +128,22 @@ class WebAuthnService:
         """Generate authentication options."""
         options = generate_authentication_options(
             rp_id=WebAuthnService._get_rp_id(),
-            allow_credentials=[
-                PublicKeyCredentialDescriptor(
-                    type="public-key",
-                    id=cred.id,  # ✅ Must be raw bytes in DB
-                    transports=[AuthenticatorTransport.TRANSPORT_USB],
-                )
-                for cred in user.webauthn_credentials
-            ],
+            allow_credentials=WebAuthnService._descriptors(user),
         )
         return options_to_json(options)
 
     @staticmethod
     def finish_authentication(user, response_json, expected_challenge: str):
-        """Verify authentication response."""
-        credential = AuthenticationCredential.parse_raw(response_json)
+        """Verify authentication response. `user` should come from load_user (credentials loaded)."""
+        credential = parse_authentication_credential_json(response_json)
 
-        db_cred = WebAuthnCredential.query.filter_by(
-            id=credential.raw_id, user_id=user.id
-        ).first()
+        db_cred = next((c for c in user.webauthn_credentials if c.id == credential.raw_id), None)
         if not db_cred:
             raise ValueError("Credential not found")
 
         verification = verify_authentication_response(
             credential=credential,
-            expected_challenge=expected_challenge,
+            expected_challenge=base64url_to_bytes(expected_challenge),
             expected_rp_id=WebAuthnService._get_rp_id(),
             expected_origin=WebAuthnService._get_origin(),
             credential_public_key=db_cred.public_key,
@@ -117,3 +153,9 @@ class WebAuthnService:
         db_cred.counter = verification.new_sign_count
         db.session.commit()
         return verification
+
+
+def _transports(values):
+    """Stored transport strings as enum members; USB when none were recorded."""
+    known = {t.value: t for t in AuthenticatorTransport}
+    return [known[v] for v in values if v in known] or [AuthenticatorTransport.USB]
@@ -1,2 +1,12 @@
 #!/bin/bash
-gunicorn app:app --bind 0.0.0.0:$PORT
+set -e
+cd "$(dirname "$0")"
+# The repo root is itself a package; put it on the path so `flask --app app` finds app.py's imports
+export PYTHONPATH="$PWD${PYTHONPATH:+:$PYTHONPATH}"
+
+# Create/upgrade the schema once, then boot workers without touching the database
+export DB_AUTO_INIT=0
+# Workers and maintenance commands share one response cache, so every write invalidates it
+export RESPONSE_CACHE="${RESPONSE_CACHE:-sqlite}"
+flask --app app init-db
+exec gunicorn app:app --bind 0.0.0.0:$PORT